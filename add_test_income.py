@@ -40,7 +40,7 @@ def add_income():
         logging.info(f"Logged in. User ID: {user_id}")
 
         # 2. Add 10000 Income
-        headers = {'User-Id': user_id, 'Content-Type': 'application/json'}
+        headers = {'Authorization': f"Bearer {user_data['token']}", 'Content-Type': 'application/json'}
         income_data = {
             'amount': 10000,
             'description': 'Manual Entry 10000',
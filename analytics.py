@@ -0,0 +1,157 @@
+"""Vectorised ledger analytics.
+
+A user's transactions of one kind are loaded in a single query into three
+NumPy columns: the day (days since 1970-01-01), the amount in cents and a
+category code. Every statistic below is computed with array operations on
+those columns, so the Python-level work does not grow with the number of
+rows. Amounts stay integer cents until they are returned.
+
+Like chart_render, this module imports numpy at the top and is itself only
+imported by the analytics routes, so app startup does not pay for numpy.
+"""
+import numpy as np
+
+PERIODS = ('day', 'week', 'month')
+# 1970-01-01 was a Thursday; shifting by 3 days makes weeks start on Monday
+WEEK_OFFSET = 3
+
+
+class Ledger:
+    def __init__(self, days, cents, codes, categories):
+        self.days = days              # int64 days since the epoch
+        self.cents = cents            # int64 amounts
+        self.codes = codes            # int64 index into categories
+        self.categories = categories  # list of category names
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build the columns from (epoch day, cents, category) rows."""
+        count = len(rows)
+        index = {}
+        days = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+        cents = np.fromiter((row[1] for row in rows), dtype=np.int64, count=count)
+        codes = np.fromiter((index.setdefault(row[2], len(index)) for row in rows), dtype=np.int64, count=count)
+        return cls(days, cents, codes, list(index))
+
+    def __len__(self):
+        return len(self.days)
+
+
+def to_amounts(cents):
+    return np.round(np.asarray(cents, dtype=np.float64) / 100, 2).tolist()
+
+
+def period_keys(days, period):
+    """Map epoch days to consecutive integer bucket keys for the period."""
+    if period == 'day':
+        return days
+    if period == 'week':
+        return (days + WEEK_OFFSET) // 7
+    return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+def period_labels(first_key, count, period):
+    keys = np.arange(first_key, first_key + count)
+    if period == 'day':
+        return np.datetime_as_string(keys.astype('datetime64[D]')).tolist()
+    if period == 'week':
+        # Labelled by the Monday that starts the week
+        return np.datetime_as_string((keys * 7 - WEEK_OFFSET).astype('datetime64[D]')).tolist()
+    return np.datetime_as_string(keys.astype('datetime64[M]')).tolist()
+
+
+def bucket_totals(ledger, period):
+    """Totals (cents) and counts per bucket, from the first to the last bucket
+    with data; buckets without transactions are zero.
+
+    Returns (labels, totals, counts).
+    """
+    if not len(ledger):
+        return [], np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    keys = period_keys(ledger.days, period)
+    first = keys.min()
+    size = int(keys.max() - first + 1)
+    # float64 weights are exact for integer sums below 2**53 cents
+    totals = np.rint(np.bincount(keys - first, weights=ledger.cents, minlength=size)).astype(np.int64)
+    counts = np.bincount(keys - first, minlength=size)
+    return period_labels(int(first), size, period), totals, counts
+
+
+def rolling_mean(values, window):
+    """Trailing mean over `window` buckets; the first buckets average what exists."""
+    values = np.asarray(values, dtype=np.float64)
+    sums = np.cumsum(values)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums / np.minimum(np.arange(1, len(values) + 1), window)
+
+
+def month_over_month(ledger):
+    """Monthly totals with the change from the previous month."""
+    labels, totals, _ = bucket_totals(ledger, 'month')
+    if not len(totals):
+        return {'labels': [], 'totals': [], 'delta': [], 'deltaPercent': []}
+    delta = np.diff(totals)
+    previous = totals[:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent = np.where(previous != 0, delta * 100.0 / previous, np.nan)
+    return {
+        'labels': labels,
+        'totals': to_amounts(totals),
+        'delta': [None] + to_amounts(delta),
+        'deltaPercent': [None] + [None if np.isnan(p) else round(float(p), 2) for p in percent]
+    }
+
+
+def category_percentiles(ledger, percentiles):
+    """Count, mean and the given percentiles of the amounts in each category.
+
+    Percentiles use linear interpolation between the sorted amounts, like
+    numpy.percentile, but for all categories at once.
+    """
+    if not len(ledger):
+        return {}
+    order = np.lexsort((ledger.cents, ledger.codes))
+    sorted_cents = ledger.cents[order].astype(np.float64)
+    counts = np.bincount(ledger.codes, minlength=len(ledger.categories))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    sums = np.bincount(ledger.codes, weights=ledger.cents, minlength=len(ledger.categories))
+
+    fractions = np.asarray(percentiles, dtype=np.float64) / 100
+    # positions[i, j]: index of percentile j of category i in sorted_cents
+    positions = starts[:, None] + (counts[:, None] - 1) * fractions[None, :]
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, (starts + counts - 1)[:, None])
+    weight = positions - lower
+    values = sorted_cents[lower] + (sorted_cents[upper] - sorted_cents[lower]) * weight
+
+    result = {}
+    for code, name in enumerate(ledger.categories):
+        result[name] = {
+            'count': int(counts[code]),
+            'mean': round(float(sums[code]) / int(counts[code]) / 100, 2),
+            'percentiles': {f'p{p:g}': round(float(values[code, j]) / 100, 2) for j, p in enumerate(percentiles)}
+        }
+    return dict(sorted(result.items()))
+
+
+def linear_forecast(ledger, months_ahead):
+    """Least-squares line through the monthly totals, extended months_ahead.
+
+    Forecasts are clamped at zero. Needs at least two months of history.
+    """
+    labels, totals, _ = bucket_totals(ledger, 'month')
+    if len(totals) < 2:
+        return None
+    x = np.arange(len(totals), dtype=np.float64)
+    slope, intercept = np.polyfit(x, totals.astype(np.float64), 1)
+    future_x = np.arange(len(totals), len(totals) + months_ahead, dtype=np.float64)
+    forecast = np.maximum(slope * future_x + intercept, 0)
+    last_month = np.datetime64(labels[-1], 'M')
+    future_labels = np.datetime_as_string(last_month + np.arange(1, months_ahead + 1)).tolist()
+    return {
+        'labels': labels,
+        'totals': to_amounts(totals),
+        'forecastLabels': future_labels,
+        'forecast': to_amounts(np.rint(forecast)),
+        'slopePerMonth': round(slope / 100, 2)
+    }
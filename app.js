@@ -28,6 +28,11 @@ let currentTab = 'expense';
 let editingId = null;
 let currentUser = null;
 
+// Headers that authenticate API calls with the token issued at login
+function authHeaders() {
+    return { 'Authorization': `Bearer ${currentUser ? currentUser.token : ''}` };
+}
+
 // DOM Elements
 const loginPage = document.getElementById('login-page');
 const registerPage = document.getElementById('register-page');
@@ -136,7 +141,7 @@ loginForm.addEventListener('submit', async (e) => {
         const data = await response.json();
 
         if (response.ok) {
-            currentUser = data.user;
+            currentUser = { ...data.user, token: data.token };
             localStorage.setItem('user', JSON.stringify(currentUser));
             currentUserSpan.textContent = currentUser.username;
             loginPage.classList.remove('active');
@@ -184,12 +189,14 @@ registerForm.addEventListener('submit', async (e) => {
 });
 
 // Logout
-logoutBtn.addEventListener('click', () => {
+function logout() {
     currentUser = null;
     localStorage.removeItem('user');
     app.classList.remove('active');
     loginPage.classList.add('active');
-});
+}
+
+logoutBtn.addEventListener('click', logout);
 
 // Form submission
 document.getElementById('transaction-form').addEventListener('submit', async (e) => {
@@ -224,7 +231,7 @@ document.getElementById('transaction-form').addEventListener('submit', async (e)
                 method: 'PUT',
                 headers: {
                     'Content-Type': 'application/json',
-                    'User-Id': currentUser ? currentUser.id : ''
+                    ...authHeaders()
                 },
                 body: JSON.stringify(transactionData)
             });
@@ -235,13 +242,17 @@ document.getElementById('transaction-form').addEventListener('submit', async (e)
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
-                    'User-Id': currentUser ? currentUser.id.toString() : ''
+                    ...authHeaders()
                 },
                 body: JSON.stringify(transactionData)
             });
         }
 
         if (response.ok) {
+            const saved = await response.json();
+            if (saved.budget && saved.budget.overspent) {
+                alert(`Over the ${saved.budget.category} budget for ${saved.budget.month} by $${(-saved.budget.remaining).toFixed(2)}`);
+            }
             document.getElementById('transaction-form').reset();
             document.getElementById('date').valueAsDate = new Date();
             editingId = null;
@@ -263,9 +274,16 @@ document.getElementById('transaction-form').addEventListener('submit', async (e)
 async function loadDashboardData() {
     try {
         if (!currentUser) return;
-        const headers = { 'User-Id': currentUser.id };
-        const response = await fetch(`${API_BASE_URL}/dashboard`, { headers });
-        const data = await response.json();
+        const headers = authHeaders();
+        // One request: the 5 newest transactions with the dashboard summary embedded
+        const response = await fetch(`${API_BASE_URL}/transactions?limit=5&include=summary`, { headers });
+        if (response.status === 401) {
+            // The login token expired; ask for the password again
+            logout();
+            return;
+        }
+        const page = await response.json();
+        const data = page.summary;
 
         document.getElementById('total-income').textContent = `$${data.totalIncome.toFixed(2)}`;
         document.getElementById('total-expenses').textContent = `$${data.totalExpenses.toFixed(2)}`;
@@ -273,8 +291,8 @@ async function loadDashboardData() {
 
         // Update recent transactions on dashboard (mixed)
         const recentDashboardContainer = document.getElementById('recent-transactions-dashboard');
-        if (data.recentTransactions.length > 0) {
-            recentDashboardContainer.innerHTML = data.recentTransactions.map(transaction => `
+        if (page.items.length > 0) {
+            recentDashboardContainer.innerHTML = page.items.map(transaction => `
                 <div class="transaction-item">
                     <div class="transaction-info">
                         <div class="transaction-title">${transaction.description}</div>
@@ -296,18 +314,14 @@ async function loadDashboardData() {
             `;
         }
 
-        // Get all income and expense transactions separately
-        const incomeResponse = await fetch(`${API_BASE_URL}/income`, { headers });
-        const expenseResponse = await fetch(`${API_BASE_URL}/expenses`, { headers });
-        const allIncome = await incomeResponse.json();
-        const allExpenses = await expenseResponse.json();
+        // The latest 5 income and expense transactions come with the summary
+        const recentIncome = data.recentIncome;
+        const recentExpenses = data.recentExpenses;
 
         // Update income transactions in dashboard
         const incomeContainer = document.getElementById('income-transactions-dashboard');
-        if (allIncome.length > 0) {
-            // Sort by date descending and take last 5
-            const sortedIncome = [...allIncome].sort((a, b) => new Date(b.date) - new Date(a.date)).slice(0, 5);
-            incomeContainer.innerHTML = sortedIncome.map(income => `
+        if (recentIncome.length > 0) {
+            incomeContainer.innerHTML = recentIncome.map(income => `
                 <div class="transaction-small">
                     <div class="transaction-small-info">
                         <h4>${income.description}</h4>
@@ -328,10 +342,8 @@ async function loadDashboardData() {
 
         // Update expense transactions in dashboard
         const expenseContainer = document.getElementById('expense-transactions-dashboard');
-        if (allExpenses.length > 0) {
-            // Sort by date descending and take last 5
-            const sortedExpenses = [...allExpenses].sort((a, b) => new Date(b.date) - new Date(a.date)).slice(0, 5);
-            expenseContainer.innerHTML = sortedExpenses.map(expense => `
+        if (recentExpenses.length > 0) {
+            expenseContainer.innerHTML = recentExpenses.map(expense => `
                 <div class="transaction-small">
                     <div class="transaction-small-info">
                         <h4>${expense.description}</h4>
@@ -385,19 +397,23 @@ async function loadDashboardData() {
     }
 }
 
-// Load income sources chart
-async function loadIncomeSourcesChart() {
+// Fetch a chart as a PNG and show it in the given <img>, or show the
+// placeholder message when there is nothing to plot. The browser revalidates
+// with the chart's ETag, so unchanged charts come back as a bodiless 304.
+async function loadChartImage(chartPath, imageId, messageId) {
+    const chartImage = document.getElementById(imageId);
+    const noChartMessage = document.getElementById(messageId);
     try {
         if (!currentUser) return;
-        const headers = { 'User-Id': currentUser.id };
-        const response = await fetch(`${API_BASE_URL}/chart/income-sources`, { headers });
-        const data = await response.json();
-
-        const chartImage = document.getElementById('income-sources-chart');
-        const noChartMessage = document.getElementById('no-income-sources-chart');
+        const headers = authHeaders();
+        const response = await fetch(`${API_BASE_URL}/chart/${chartPath}?format=png`, { headers });
 
-        if (data.image) {
-            chartImage.src = `data:image/png;base64,${data.image}`;
+        if (response.status === 200) {
+            const blob = await response.blob();
+            if (chartImage.src.startsWith('blob:')) {
+                URL.revokeObjectURL(chartImage.src);
+            }
+            chartImage.src = URL.createObjectURL(blob);
             chartImage.style.display = 'block';
             noChartMessage.style.display = 'none';
         } else {
@@ -405,121 +421,219 @@ async function loadIncomeSourcesChart() {
             noChartMessage.style.display = 'block';
         }
     } catch (error) {
-        console.error('Error loading income sources chart:', error);
-        document.getElementById('income-sources-chart').style.display = 'none';
-        document.getElementById('no-income-sources-chart').style.display = 'block';
+        console.error(`Error loading ${chartPath} chart:`, error);
+        chartImage.style.display = 'none';
+        noChartMessage.style.display = 'block';
     }
 }
 
-// Load daily expenses chart
-async function loadDailyExpensesChart() {
-    try {
-        if (!currentUser) return;
-        const headers = { 'User-Id': currentUser.id };
-        const response = await fetch(`${API_BASE_URL}/chart/daily-expenses`, { headers });
-        const data = await response.json();
+// Lightweight canvas chart renderer
+// Charts are drawn in the browser from the compact series returned by
+// /api/chart-data/*, then shown in the existing <img> elements.
+const CHART_STYLES = {
+    'expense-categories': { kind: 'pie', title: 'Expenses by Category',
+        colors: ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8', '#F7DC6F', '#BB8FCE', '#85C1E9'] },
+    'income-sources': { kind: 'pie', title: 'Income by Source',
+        colors: ['#4cc9f0', '#4361ee', '#3a0ca3', '#7209b7', '#f72585', '#4895ef', '#4cc9f0', '#f8961e', '#90be6d', '#f9c74f'] },
+    'income-by-month': { kind: 'bar', title: 'Monthly Income', colors: ['#4cc9f0'] },
+    'expense-trends': { kind: 'line', title: 'Monthly Expense Trends', colors: ['#f72585'] },
+    'daily-expenses': { kind: 'bar', title: 'Daily Expenses (Last 7 Days)', colors: ['#f72585'] },
+    'income-vs-expenses': { kind: 'grouped-bar', title: 'Monthly Income vs Expenses', colors: ['#4cc9f0', '#f72585'] }
+};
+
+function drawPieChart(ctx, width, height, data, style) {
+    const total = data.values.reduce((sum, value) => sum + value, 0);
+    const radius = Math.min(width, height) / 2 - 80;
+    const cx = width / 2;
+    const cy = height / 2 + 20;
+    let angle = -Math.PI / 2;
+
+    ctx.font = '14px sans-serif';
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'middle';
+    data.values.forEach((value, i) => {
+        const slice = total ? (value / total) * Math.PI * 2 : 0;
+        ctx.fillStyle = style.colors[i % style.colors.length];
+        ctx.beginPath();
+        ctx.moveTo(cx, cy);
+        ctx.arc(cx, cy, radius, angle, angle + slice);
+        ctx.closePath();
+        ctx.fill();
+
+        const mid = angle + slice / 2;
+        ctx.fillStyle = '#333';
+        ctx.fillText(data.labels[i], cx + Math.cos(mid) * (radius + 30), cy + Math.sin(mid) * (radius + 30));
+        ctx.fillText(`${((value / total) * 100).toFixed(1)}%`, cx + Math.cos(mid) * radius * 0.6, cy + Math.sin(mid) * radius * 0.6);
+        angle += slice;
+    });
+}
 
-        const chartImage = document.getElementById('daily-expenses-chart');
-        const noChartMessage = document.getElementById('no-daily-expenses-chart');
+function drawAxisChart(ctx, width, height, data, style) {
+    const series = style.kind === 'grouped-bar' ? [data.income, data.expenses] : [data.values];
+    const left = 70, right = 20, top = 60, bottom = 70;
+    const plotWidth = width - left - right;
+    const plotHeight = height - top - bottom;
+    const max = Math.max(...series.flat(), 0) || 1;
+    const step = plotWidth / data.labels.length;
+    const y = value => top + plotHeight - (value / max) * plotHeight;
+
+    // Axes and grid
+    ctx.strokeStyle = '#ddd';
+    ctx.fillStyle = '#666';
+    ctx.font = '12px sans-serif';
+    ctx.textAlign = 'right';
+    ctx.textBaseline = 'middle';
+    for (let i = 0; i <= 4; i++) {
+        const value = (max / 4) * i;
+        ctx.beginPath();
+        ctx.moveTo(left, y(value));
+        ctx.lineTo(width - right, y(value));
+        ctx.stroke();
+        ctx.fillText(`$${value.toFixed(0)}`, left - 8, y(value));
+    }
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'top';
+    data.labels.forEach((label, i) => ctx.fillText(label, left + step * (i + 0.5), top + plotHeight + 10));
+
+    if (style.kind === 'line') {
+        ctx.strokeStyle = style.colors[0];
+        ctx.fillStyle = style.colors[0];
+        ctx.lineWidth = 2;
+        ctx.beginPath();
+        data.values.forEach((value, i) => {
+            const x = left + step * (i + 0.5);
+            if (i === 0) ctx.moveTo(x, y(value)); else ctx.lineTo(x, y(value));
+        });
+        ctx.stroke();
+        data.values.forEach((value, i) => {
+            ctx.beginPath();
+            ctx.arc(left + step * (i + 0.5), y(value), 5, 0, Math.PI * 2);
+            ctx.fill();
+        });
+        ctx.lineWidth = 1;
+        return;
+    }
 
-        if (data.image) {
-            chartImage.src = `data:image/png;base64,${data.image}`;
-            chartImage.style.display = 'block';
-            noChartMessage.style.display = 'none';
-        } else {
-            chartImage.style.display = 'none';
-            noChartMessage.style.display = 'block';
-        }
-    } catch (error) {
-        console.error('Error loading daily expenses chart:', error);
-        document.getElementById('daily-expenses-chart').style.display = 'none';
-        document.getElementById('no-daily-expenses-chart').style.display = 'block';
+    const barWidth = (step * 0.7) / series.length;
+    series.forEach((values, s) => {
+        ctx.fillStyle = style.colors[s % style.colors.length];
+        values.forEach((value, i) => {
+            const x = left + step * i + step * 0.15 + barWidth * s;
+            ctx.fillRect(x, y(value), barWidth, top + plotHeight - y(value));
+        });
+    });
+}
+
+function drawChart(canvas, data, style) {
+    const ctx = canvas.getContext('2d');
+    ctx.fillStyle = '#fff';
+    ctx.fillRect(0, 0, canvas.width, canvas.height);
+    ctx.fillStyle = '#222';
+    ctx.font = 'bold 20px sans-serif';
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'top';
+    ctx.fillText(style.title, canvas.width / 2, 15);
+
+    if (style.kind === 'pie') {
+        drawPieChart(ctx, canvas.width, canvas.height, data, style);
+    } else {
+        drawAxisChart(ctx, canvas.width, canvas.height, data, style);
     }
 }
 
-// Load income sources report chart
-async function loadIncomeSourcesReportChart() {
+// Fetch a chart's series and draw it client-side; falls back to the
+// server-rendered image if the data request or drawing fails.
+async function loadChart(chartPath, imageId, messageId) {
+    const chartImage = document.getElementById(imageId);
+    const noChartMessage = document.getElementById(messageId);
     try {
         if (!currentUser) return;
-        const headers = { 'User-Id': currentUser.id };
-        const response = await fetch(`${API_BASE_URL}/chart/income-sources`, { headers });
+        const headers = authHeaders();
+        const response = await fetch(`${API_BASE_URL}/chart-data/${chartPath}`, { headers });
+        if (!response.ok) throw new Error(`Status ${response.status}`);
         const data = await response.json();
 
-        const chartImage = document.getElementById('income-sources-report-chart');
-        const noChartMessage = document.getElementById('no-income-sources-report-chart');
-
-        if (data.image) {
-            chartImage.src = `data:image/png;base64,${data.image}`;
-            chartImage.style.display = 'block';
-            noChartMessage.style.display = 'none';
-        } else {
+        if (data.labels.length === 0) {
             chartImage.style.display = 'none';
             noChartMessage.style.display = 'block';
+            return;
         }
+
+        const canvas = document.createElement('canvas');
+        canvas.width = 800;
+        canvas.height = 500;
+        drawChart(canvas, data, CHART_STYLES[chartPath]);
+        chartImage.src = canvas.toDataURL('image/png');
+        chartImage.style.display = 'block';
+        noChartMessage.style.display = 'none';
     } catch (error) {
-        console.error('Error loading income sources report chart:', error);
-        document.getElementById('income-sources-report-chart').style.display = 'none';
-        document.getElementById('no-income-sources-report-chart').style.display = 'block';
+        console.error(`Error drawing ${chartPath} chart, using server image:`, error);
+        await loadChartImage(chartPath, imageId, messageId);
     }
 }
 
+// Load income sources chart
+async function loadIncomeSourcesChart() {
+    await loadChart('income-sources', 'income-sources-chart', 'no-income-sources-chart');
+}
+
+// Load daily expenses chart
+async function loadDailyExpensesChart() {
+    await loadChart('daily-expenses', 'daily-expenses-chart', 'no-daily-expenses-chart');
+}
+
+// Load income sources report chart
+async function loadIncomeSourcesReportChart() {
+    await loadChart('income-sources', 'income-sources-report-chart', 'no-income-sources-report-chart');
+}
+
 // Load expense categories report chart
 async function loadExpenseCategoriesReportChart() {
-    try {
-        if (!currentUser) return;
-        const headers = { 'User-Id': currentUser.id };
-        const response = await fetch(`${API_BASE_URL}/chart/expense-categories`, { headers });
-        const data = await response.json();
-
-        const chartImage = document.getElementById('expense-categories-report-chart');
-        const noChartMessage = document.getElementById('no-expense-categories-report-chart');
+    await loadChart('expense-categories', 'expense-categories-report-chart', 'no-expense-categories-report-chart');
+}
 
-        if (data.image) {
-            chartImage.src = `data:image/png;base64,${data.image}`;
-            chartImage.style.display = 'block';
-            noChartMessage.style.display = 'none';
-        } else {
-            chartImage.style.display = 'none';
-            noChartMessage.style.display = 'block';
-        }
-    } catch (error) {
-        console.error('Error loading expense categories report chart:', error);
-        document.getElementById('expense-categories-report-chart').style.display = 'none';
-        document.getElementById('no-expense-categories-report-chart').style.display = 'block';
-    }
+// Render a single transaction row in the transactions list
+function renderTransactionItem(transaction) {
+    return `
+        <div class="transaction-item">
+            <div class="transaction-info">
+                <div class="transaction-title">${transaction.description}</div>
+                <div class="transaction-category">${transaction.category || 'Income'}</div>
+                <div class="transaction-date">${new Date(transaction.date).toLocaleDateString()}</div>
+            </div>
+            <div class="transaction-amount ${currentTab}">
+                ${currentTab === 'income' ? '+' : '-'}$${transaction.amount.toFixed(2)}
+            </div>
+            <div class="transaction-actions">
+                <button class="action-btn btn-warning" onclick="editTransaction(${transaction.id})">
+                    <i class="fas fa-edit"></i>
+                </button>
+                <button class="action-btn btn-danger" onclick="deleteTransaction(${transaction.id})">
+                    <i class="fas fa-trash"></i>
+                </button>
+            </div>
+        </div>
+    `;
 }
 
-// Load transactions
-async function loadTransactions() {
+// Load transactions (first page, or the next page when a cursor is given)
+async function loadTransactions(cursor = null) {
     try {
         if (!currentUser) return;
-        const headers = { 'User-Id': currentUser.id };
+        const headers = authHeaders();
         const endpoint = currentTab === 'expense' ? 'expenses' : 'income';
-        const response = await fetch(`${API_BASE_URL}/${endpoint}`, { headers });
-        const transactions = await response.json();
+        const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+        const response = await fetch(`${API_BASE_URL}/${endpoint}${query}`, { headers });
+        const page = await response.json();
 
         const transactionsList = document.getElementById('transactions-list');
-        if (transactions.length > 0) {
-            transactionsList.innerHTML = transactions.map(transaction => `
-                <div class="transaction-item">
-                    <div class="transaction-info">
-                        <div class="transaction-title">${transaction.description}</div>
-                        <div class="transaction-category">${transaction.category || 'Income'}</div>
-                        <div class="transaction-date">${new Date(transaction.date).toLocaleDateString()}</div>
-                    </div>
-                    <div class="transaction-amount ${currentTab}">
-                        ${currentTab === 'income' ? '+' : '-'}$${transaction.amount.toFixed(2)}
-                    </div>
-                    <div class="transaction-actions">
-                        <button class="action-btn btn-warning" onclick="editTransaction(${transaction.id})">
-                            <i class="fas fa-edit"></i>
-                        </button>
-                        <button class="action-btn btn-danger" onclick="deleteTransaction(${transaction.id})">
-                            <i class="fas fa-trash"></i>
-                        </button>
-                    </div>
-                </div>
-            `).join('');
+        const existingLoadMore = document.getElementById('load-more-transactions');
+        if (existingLoadMore) existingLoadMore.remove();
+
+        if (cursor) {
+            transactionsList.insertAdjacentHTML('beforeend', page.items.map(renderTransactionItem).join(''));
+        } else if (page.items.length > 0) {
+            transactionsList.innerHTML = page.items.map(renderTransactionItem).join('');
         } else {
             transactionsList.innerHTML = `
                 <div class="empty-state">
@@ -529,6 +643,14 @@ async function loadTransactions() {
                 </div>
             `;
         }
+
+        if (page.nextCursor) {
+            transactionsList.insertAdjacentHTML('beforeend', `
+                <button class="btn-primary" id="load-more-transactions">Load more</button>
+            `);
+            document.getElementById('load-more-transactions')
+                .addEventListener('click', () => loadTransactions(page.nextCursor));
+        }
     } catch (error) {
         console.error('Error loading transactions:', error);
         document.getElementById('transactions-list').innerHTML = '<p>Error loading transactions. Please try again.</p>';
@@ -537,109 +659,29 @@ async function loadTransactions() {
 
 // Load expense chart
 async function loadExpenseChart() {
-    try {
-        const headers = { 'User-Id': currentUser ? currentUser.id : '' };
-        const response = await fetch(`${API_BASE_URL}/chart/expense-categories`, { headers });
-        const data = await response.json();
-
-        const chartImage = document.getElementById('expense-chart');
-        const noChartMessage = document.getElementById('no-chart-message');
-
-        if (data.image) {
-            chartImage.src = `data:image/png;base64,${data.image}`;
-            chartImage.style.display = 'block';
-            noChartMessage.style.display = 'none';
-        } else {
-            chartImage.style.display = 'none';
-            noChartMessage.style.display = 'block';
-        }
-    } catch (error) {
-        console.error('Error loading chart:', error);
-        document.getElementById('expense-chart').style.display = 'none';
-        document.getElementById('no-chart-message').style.display = 'block';
-    }
+    await loadChart('expense-categories', 'expense-chart', 'no-chart-message');
 }
 
 // Load income by month chart
 async function loadIncomeByMonthChart() {
-    try {
-        const headers = { 'User-Id': currentUser ? currentUser.id : '' };
-        const response = await fetch(`${API_BASE_URL}/chart/income-by-month`, { headers });
-        const data = await response.json();
-
-        const chartImage = document.getElementById('income-monthly-chart');
-        const noChartMessage = document.getElementById('no-income-chart-message');
-
-        if (data.image) {
-            chartImage.src = `data:image/png;base64,${data.image}`;
-            chartImage.style.display = 'block';
-            noChartMessage.style.display = 'none';
-        } else {
-            chartImage.style.display = 'none';
-            noChartMessage.style.display = 'block';
-        }
-    } catch (error) {
-        console.error('Error loading income chart:', error);
-        document.getElementById('income-monthly-chart').style.display = 'none';
-        document.getElementById('no-income-chart-message').style.display = 'block';
-    }
+    await loadChart('income-by-month', 'income-monthly-chart', 'no-income-chart-message');
 }
 
 // Load expense trends chart
 async function loadExpenseTrendsChart() {
-    try {
-        const headers = { 'User-Id': currentUser ? currentUser.id : '' };
-        const response = await fetch(`${API_BASE_URL}/chart/expense-trends`, { headers });
-        const data = await response.json();
-
-        const chartImage = document.getElementById('expense-trends-chart');
-        const noChartMessage = document.getElementById('no-trends-chart-message');
-
-        if (data.image) {
-            chartImage.src = `data:image/png;base64,${data.image}`;
-            chartImage.style.display = 'block';
-            noChartMessage.style.display = 'none';
-        } else {
-            chartImage.style.display = 'none';
-            noChartMessage.style.display = 'block';
-        }
-    } catch (error) {
-        console.error('Error loading trends chart:', error);
-        document.getElementById('expense-trends-chart').style.display = 'none';
-        document.getElementById('no-trends-chart-message').style.display = 'block';
-    }
+    await loadChart('expense-trends', 'expense-trends-chart', 'no-trends-chart-message');
 }
 
 // Load income vs expenses comparison chart
 async function loadIncomeVsExpensesChart() {
-    try {
-        const headers = { 'User-Id': currentUser ? currentUser.id : '' };
-        const response = await fetch(`${API_BASE_URL}/chart/income-vs-expenses`, { headers });
-        const data = await response.json();
-
-        const chartImage = document.getElementById('comparison-chart');
-        const noChartMessage = document.getElementById('no-comparison-chart-message');
-
-        if (data.image) {
-            chartImage.src = `data:image/png;base64,${data.image}`;
-            chartImage.style.display = 'block';
-            noChartMessage.style.display = 'none';
-        } else {
-            chartImage.style.display = 'none';
-            noChartMessage.style.display = 'block';
-        }
-    } catch (error) {
-        console.error('Error loading comparison chart:', error);
-        document.getElementById('comparison-chart').style.display = 'none';
-        document.getElementById('no-comparison-chart-message').style.display = 'block';
-    }
+    await loadChart('income-vs-expenses', 'comparison-chart', 'no-comparison-chart-message');
 }
 
 // Edit transaction
 async function editTransaction(id) {
     try {
         if (!currentUser) return;
-        const headers = { 'User-Id': currentUser.id };
+        const headers = authHeaders();
         const endpoint = currentTab === 'expense' ? 'expenses' : 'income';
         const response = await fetch(`${API_BASE_URL}/${endpoint}/${id}`, { headers });
         const transaction = await response.json();
@@ -673,9 +715,7 @@ async function deleteTransaction(id) {
         const endpoint = currentTab === 'expense' ? 'expenses' : 'income';
         const response = await fetch(`${API_BASE_URL}/${endpoint}/${id}`, {
             method: 'DELETE',
-            headers: {
-                'User-Id': currentUser ? currentUser.id : ''
-            }
+            headers: authHeaders()
         });
 
         if (response.ok) {
@@ -697,7 +737,7 @@ async function downloadPDFReport() {
             alert('Please login first');
             return;
         }
-        const headers = { 'User-Id': currentUser.id.toString() };
+        const headers = authHeaders();
         const response = await fetch(`${API_BASE_URL}/report/pdf`, { headers });
         
         if (response.status === 501) {
@@ -735,12 +775,17 @@ window.addEventListener('DOMContentLoaded', () => {
     if (savedUser) {
         try {
             currentUser = JSON.parse(savedUser);
+            if (!currentUser.token) {
+                // Saved before logins issued tokens; log in again
+                throw new Error('missing token');
+            }
             currentUserSpan.textContent = currentUser.username;
             loginPage.classList.remove('active');
             app.classList.add('active');
             loadDashboardData();
         } catch (e) {
             console.error('Error parsing saved user:', e);
+            currentUser = null;
             localStorage.removeItem('user');
         }
     }
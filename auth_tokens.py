@@ -0,0 +1,77 @@
+"""Signed bearer tokens for API authentication.
+
+A token is "<user id>.<expiry>.<signature>", where the signature is an
+HMAC-SHA256 of the user id and expiry (a Unix timestamp) under the server's
+secret key. Checking a token only recomputes the HMAC, so authenticating a
+request needs no database or cache lookup, and every worker that shares the
+secret accepts the tokens of the others.
+
+Tokens cannot be revoked individually before they expire; changing the
+secret key invalidates all of them.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+
+
+class TokenSigner:
+    def __init__(self, secret, ttl):
+        self._key = secret.encode() if isinstance(secret, str) else secret
+        self.ttl = ttl
+
+    def _signature(self, payload):
+        digest = hmac.new(self._key, payload.encode('utf-8', 'surrogateescape'), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+    def issue(self, user_id, now=None):
+        """Return (token, expiry timestamp) for the user."""
+        expires = int(now if now is not None else time.time()) + self.ttl
+        payload = f'{user_id}.{expires}'
+        return f'{payload}.{self._signature(payload)}', expires
+
+    def verify(self, token, now=None):
+        """Return the user id of a valid, unexpired token, or None."""
+        payload, _, signature = token.rpartition('.')
+        user_id, _, expires = payload.partition('.')
+        # Compared as bytes: compare_digest rejects str with non-ASCII characters
+        if not hmac.compare_digest(signature.encode('utf-8', 'surrogateescape'),
+                                   self._signature(payload).encode()):
+            return None
+        try:
+            if int(expires) < (now if now is not None else time.time()):
+                return None
+            return int(user_id)
+        except ValueError:
+            return None
+
+
+def load_or_create_secret(path):
+    """Read the secret key from path, creating a random one on first use.
+
+    Keeping it in a file (rather than generating one per process) lets all
+    workers of a deployment verify each other's tokens and keeps users logged
+    in across restarts.
+    """
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write a complete file under a temporary name, then link it into place;
+    # if another worker got there first its key wins and ours is discarded
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(secrets.token_bytes(32))
+    try:
+        os.link(temp_path, path)
+    except FileExistsError:
+        pass
+    finally:
+        os.unlink(temp_path)
+    with open(path, 'rb') as f:
+        return f.read()
@@ -0,0 +1,135 @@
+"""Vectorised analytics versus per-row Python loops.
+
+For each ledger size, computes the full analytics set (daily, weekly and
+monthly buckets, a 7-day rolling mean, month-over-month deltas, per-category
+percentiles and a 3-month linear forecast) twice. The first pass uses
+analytics.py on NumPy columns. The second uses per-row Python loops over
+fetched rows, which is how the chart handlers used to aggregate. The script
+also checks that both approaches agree. Loading the rows dominates the
+vectorised path, so load and compute times are reported separately.
+
+    python benchmarks/bench_analytics.py [--sizes 10000,100000,1000000]
+"""
+import argparse
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from common import create_user, expense_app, seed_ledger
+
+PERCENTILES = [50, 90, 99]
+
+
+def load_columns(user_id):
+    return expense_app.load_ledger(expense_app.Expense, user_id)
+
+
+def vectorised(ledger):
+    import analytics
+    result = {}
+    for period in analytics.PERIODS:
+        labels, totals, _ = analytics.bucket_totals(ledger, period)
+        result[period] = dict(zip(labels, totals.tolist()))
+    _, daily, _ = analytics.bucket_totals(ledger, 'day')
+    result['rolling'] = analytics.rolling_mean(daily, 7).tolist()
+    result['mom'] = analytics.month_over_month(ledger)['delta']
+    result['percentiles'] = analytics.category_percentiles(ledger, PERCENTILES)
+    result['forecast'] = analytics.linear_forecast(ledger, 3)['forecast']
+    return result
+
+
+def percentile(sorted_values, p):
+    position = (len(sorted_values) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def load_rows(user_id):
+    Expense = expense_app.Expense
+    return expense_app.db.session.execute(
+        select(Expense.date, Expense.amount_cents, Expense.category).where(Expense.user_id == user_id)
+    ).all()
+
+
+def per_row(rows):
+    result = {'day': defaultdict(int), 'week': defaultdict(int), 'month': defaultdict(int)}
+    by_category = defaultdict(list)
+    for date, cents, category in rows:
+        result['day'][date.strftime('%Y-%m-%d')] += cents
+        result['week'][(date - timedelta(days=date.weekday())).strftime('%Y-%m-%d')] += cents
+        result['month'][date.strftime('%Y-%m')] += cents
+        by_category[category].append(cents)
+
+    # Fill the gaps between the first and last day, then a trailing mean
+    first = min(date for date, _, _ in rows).date()
+    last = max(date for date, _, _ in rows).date()
+    daily = []
+    day = first
+    while day <= last:
+        daily.append(result['day'].get(day.strftime('%Y-%m-%d'), 0))
+        day += timedelta(days=1)
+    result['rolling'] = [sum(daily[max(0, i - 6):i + 1]) / min(i + 1, 7) for i in range(len(daily))]
+
+    months = sorted(result['month'])
+    totals = [result['month'][month] for month in months]
+    result['mom'] = [None] + [round((b - a) / 100, 2) for a, b in zip(totals, totals[1:])]
+
+    result['percentiles'] = {}
+    for category, values in sorted(by_category.items()):
+        values.sort()
+        result['percentiles'][category] = {
+            'count': len(values),
+            'mean': round(sum(values) / len(values) / 100, 2),
+            'percentiles': {f'p{p:g}': round(percentile(values, p) / 100, 2) for p in PERCENTILES}
+        }
+
+    n = len(totals)
+    mean_x, mean_y = (n - 1) / 2, sum(totals) / n
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(totals)) / sum((x - mean_x) ** 2 for x in range(n))
+    intercept = mean_y - slope * mean_x
+    result['forecast'] = [round(max(round(slope * x + intercept), 0) / 100, 2) for x in range(n, n + 3)]
+    return result
+
+
+def agree(fast, slow):
+    for period in ('day', 'week', 'month'):
+        if {k: v for k, v in fast[period].items() if v} != dict(slow[period]):
+            return False
+    if any(abs(a - b) > 1e-6 for a, b in zip(fast['rolling'], slow['rolling'])):
+        return False
+    return (fast['mom'] == slow['mom'] and fast['percentiles'] == slow['percentiles']
+            and all(abs(a - b) <= 0.01 for a, b in zip(fast['forecast'], slow['forecast'])))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'load cols':>10} {'numpy':>8} {'load rows':>10} {'per-row':>9} "
+          f"{'compute x':>10} {'total x':>8} {'agree':>6}   (times in ms)")
+    for size in (int(size) for size in args.sizes.split(',')):
+        user_id = create_user(f'bench_analytics_{size}')
+        seed_ledger(user_id, expenses=size, seed=size)
+        with expense_app.app.app_context():
+            ledger, columns_ms = timed(load_columns, user_id)
+            vectorised(ledger)  # warm up the numpy import
+            fast, fast_ms = timed(vectorised, ledger)
+            rows, rows_ms = timed(load_rows, user_id)
+            slow, slow_ms = timed(per_row, rows)
+        total = (rows_ms + slow_ms) / (columns_ms + fast_ms)
+        print(f'{size:>8} {columns_ms:>10.0f} {fast_ms:>8.1f} {rows_ms:>10.0f} {slow_ms:>9.0f} '
+              f'{slow_ms / fast_ms:>9.1f}x {total:>7.1f}x {str(agree(fast, slow)):>6}')
+
+
+if __name__ == '__main__':
+    main()
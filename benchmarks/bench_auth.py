@@ -0,0 +1,54 @@
+"""Per-request authentication overhead.
+
+Times get_current_user_id() on a request carrying a bearer token (an HMAC
+check, no database access) and its parts. For comparison it also times a
+primary-key lookup in the database, which is what every request would pay
+if sessions were stored server-side, and a rejected token.
+
+    python benchmarks/bench_auth.py [--iterations 100000]
+"""
+import argparse
+import time
+
+from common import auth_headers, create_user, expense_app
+
+
+def per_call_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=100000)
+    args = parser.parse_args()
+
+    user_id = create_user('bench_auth')
+    headers = auth_headers(user_id)
+    token = headers['Authorization'].split(' ', 1)[1]
+    forged = token[:-2] + ('AA' if not token.endswith('AA') else 'BB')
+    signer = expense_app.token_signer
+    app = expense_app.app
+
+    results = {
+        'issue token': per_call_us(lambda: signer.issue(user_id), args.iterations),
+        'verify token': per_call_us(lambda: signer.verify(token), args.iterations),
+        'reject forged token': per_call_us(lambda: signer.verify(forged), args.iterations),
+    }
+    with app.test_request_context('/api/expenses', headers=headers):
+        assert expense_app.get_current_user_id() == user_id
+        results['get_current_user_id'] = per_call_us(expense_app.get_current_user_id, args.iterations)
+    with app.app_context():
+        def db_lookup():
+            expense_app.db.session.get(expense_app.User, user_id)
+            expense_app.db.session.expire_all()
+        results['database lookup (for comparison)'] = per_call_us(db_lookup, args.iterations // 10)
+
+    for name, us in results.items():
+        print(f'{name:<34} {us:>8.2f} us')
+
+
+if __name__ == '__main__':
+    main()
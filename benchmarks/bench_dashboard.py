@@ -0,0 +1,45 @@
+"""Dashboard latency as the ledger grows.
+
+Compares the SQL aggregation behind GET /api/dashboard with the previous
+approach of loading every row and summing in Python. Also times a full web UI
+dashboard load: the single /api/transactions?include=summary request against
+the previous three (dashboard, then 5 income, then 5 expenses).
+
+    python benchmarks/bench_dashboard.py
+"""
+from common import auth_headers, create_user, expense_app, seed_ledger, timeit
+
+SIZES = [1000, 10000, 100000]
+
+
+def legacy_dashboard(user_id):
+    Expense, Income = expense_app.Expense, expense_app.Income
+    expenses = Expense.query.filter_by(user_id=user_id).all()
+    incomes = Income.query.filter_by(user_id=user_id).all()
+    total_expenses = sum(expense.amount_cents for expense in expenses)
+    total_income = sum(income.amount_cents for income in incomes)
+    category_totals = {}
+    for expense in expenses:
+        category_totals[expense.category] = category_totals.get(expense.category, 0) + expense.amount_cents
+    return total_income - total_expenses, category_totals
+
+
+def main():
+    client = expense_app.app.test_client()
+    print(f"{'rows':>8} {'sql (ms)':>10} {'legacy (ms)':>12} {'ui 1 req (ms)':>14} {'ui 3 req (ms)':>14}")
+    for size in SIZES:
+        user_id = create_user(f'bench_dashboard_{size}')
+        seed_ledger(user_id, expenses=size, incomes=size // 10, seed=size)
+        headers = auth_headers(user_id)
+
+        sql_ms = timeit(lambda: client.get('/api/dashboard', headers=headers))
+        with expense_app.app.app_context():
+            legacy_ms = timeit(lambda: legacy_dashboard(user_id), repeat=5)
+        feed_ms = timeit(lambda: client.get('/api/transactions?limit=5&include=summary', headers=headers))
+        three_ms = timeit(lambda: [client.get(url, headers=headers) for url in
+                                   ('/api/dashboard', '/api/income?limit=5', '/api/expenses?limit=5')])
+        print(f'{size:>8} {sql_ms:>10.2f} {legacy_ms:>12.2f} {feed_ms:>14.2f} {three_ms:>14.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Streaming export memory and throughput.
+
+Exports ledgers of increasing size through GET /api/export and reports the
+time, output size and peak Python heap allocation while the response is
+consumed. Peak heap should stay flat as the ledger grows.
+
+    python benchmarks/bench_export.py
+"""
+import time
+import tracemalloc
+
+from common import auth_headers, create_user, expense_app, seed_ledger
+
+SIZES = [10000, 100000]
+
+
+def main():
+    client = expense_app.app.test_client()
+    print(f"{'rows':>8} {'format':>12} {'seconds':>8} {'output (KB)':>12} {'peak heap (MB)':>15}")
+    for size in SIZES:
+        user_id = create_user(f'bench_export_{size}')
+        seed_ledger(user_id, expenses=size, incomes=size // 10, seed=size)
+        headers = auth_headers(user_id)
+
+        for query in ('format=csv', 'format=ndjson', 'format=csv&gzip=1'):
+            tracemalloc.start()
+            start = time.perf_counter()
+            response = client.get(f'/api/export?{query}', headers=headers, buffered=False)
+            output = sum(len(chunk) for chunk in response.response)
+            response.close()
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f'{size + size // 10:>8} {query[7:]:>12} {elapsed:>8.2f} {output / 1024:>12.0f} {peak / 1024 / 1024:>15.1f}')
+
+
+if __name__ == '__main__':
+    main()
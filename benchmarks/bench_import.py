@@ -0,0 +1,64 @@
+"""Bulk import throughput.
+
+Posts a generated CSV and NDJSON ledger to the bulk import endpoints and
+reports rows/sec, next to the old path of one POST /api/expenses per row.
+
+    python benchmarks/bench_import.py [rows]
+"""
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from common import CATEGORIES, auth_headers, create_user, expense_app
+
+PER_ROW_SAMPLE = 1000
+
+
+def generate_records(count, seed=0):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        yield {
+            'amount': round(rng.uniform(1, 500), 2),
+            'description': f'Imported expense {i}',
+            'category': rng.choice(CATEGORIES),
+            'date': (start + timedelta(minutes=rng.randrange(60 * 24 * 730))).isoformat()
+        }
+
+
+def to_csv(records):
+    lines = ['amount,description,category,date']
+    lines += [f"{r['amount']},{r['description']},{r['category']},{r['date']}" for r in records]
+    return '\n'.join(lines) + '\n'
+
+
+def to_ndjson(records):
+    return ''.join(json.dumps(r) + '\n' for r in records)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    client = expense_app.app.test_client()
+    records = list(generate_records(rows))
+
+    for fmt, body, content_type in [('csv', to_csv(records), 'text/csv'),
+                                    ('ndjson', to_ndjson(records), 'application/x-ndjson')]:
+        headers = auth_headers(create_user(f'bench_import_{fmt}'))
+        start = time.perf_counter()
+        response = client.post('/api/expenses/import', data=body, headers=headers, content_type=content_type)
+        elapsed = time.perf_counter() - start
+        assert response.json['imported'] == rows, response.json
+        print(f'bulk {fmt:<7} {rows:>7} rows in {elapsed:6.2f}s  {rows / elapsed:>9.0f} rows/s')
+
+    headers = auth_headers(create_user('bench_import_single'))
+    start = time.perf_counter()
+    for record in records[:PER_ROW_SAMPLE]:
+        client.post('/api/expenses', json=record, headers=headers)
+    elapsed = time.perf_counter() - start
+    print(f'per-row POST {PER_ROW_SAMPLE:>7} rows in {elapsed:6.2f}s  {PER_ROW_SAMPLE / elapsed:>9.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
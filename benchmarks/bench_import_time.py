@@ -0,0 +1,63 @@
+"""Cold-start import cost of app.py.
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter and reports
+the total import time and the most expensive modules. Exits with status 1 if
+a heavy rendering library (matplotlib, numpy, reportlab) is imported at
+startup, or if the total exceeds --max-ms, so it can guard against
+regressions in CI.
+
+    python benchmarks/bench_import_time.py [--max-ms 1500] [--top 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ('matplotlib', 'numpy', 'reportlab')
+
+
+def measure():
+    env = dict(os.environ)
+    env['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='expense-bench-'), 'import.db')
+    env.setdefault('SECRET_KEY', 'benchmark')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    # Lines look like: "import time:  self [us] | cumulative | imported package"
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-ms', type=float, default=None, help='fail if importing app takes longer')
+    parser.add_argument('--top', type=int, default=10, help='number of slowest modules to list')
+    args = parser.parse_args()
+
+    modules = measure()
+    total_ms = next(cumulative for name, _, cumulative in modules if name == 'app') / 1000
+    eager = sorted({name.split('.')[0] for name, _, _ in modules if name.split('.')[0] in LAZY_MODULES})
+
+    print(f'import app: {total_ms:.1f} ms')
+    print('slowest modules (self time):')
+    for name, self_us, _ in sorted(modules, key=lambda m: m[1], reverse=True)[:args.top]:
+        print(f'  {self_us / 1000:8.1f} ms  {name}')
+
+    failed = False
+    if eager:
+        print(f'FAIL: imported at startup: {", ".join(eager)}')
+        failed = True
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f'FAIL: {total_ms:.1f} ms exceeds --max-ms {args.max_ms}')
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Per-endpoint profile from /metrics, and the cost of collecting it.
+
+Seeds a ledger, sends a mix of API requests (CRUD, dashboard, feed, charts,
+PDF) through the Flask test client and prints what /metrics recorded for
+each endpoint: mean latency, SQL statements and SQL time per request, and
+response size, plus chart and PDF render times. It then times a cheap
+request with and without the SQL event listeners to show what the
+instrumentation adds.
+
+    python benchmarks/bench_metrics.py [--rows 20000] [--rounds 20]
+"""
+import argparse
+import re
+from collections import defaultdict
+
+from common import auth_headers, create_user, expense_app, seed_ledger, timeit
+
+from sqlalchemy import event
+
+SAMPLE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(text):
+    """{(metric name, labels without le): value} for the _sum and _count samples."""
+    samples = {}
+    for line in text.splitlines():
+        match = SAMPLE.match(line)
+        if match and not match.group(1).endswith('_bucket'):
+            labels = tuple(value for name, value in LABEL.findall(match.group(2)) if name != 'method')
+            samples[match.group(1), labels] = float(match.group(3))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    user_id = create_user('bench_metrics')
+    seed_ledger(user_id, expenses=args.rows, incomes=args.rows // 10)
+    headers = auth_headers(user_id)
+    client = expense_app.app.test_client()
+
+    for i in range(args.rounds):
+        created = client.post('/api/expenses', headers=headers, json={
+            'amount': 12.5, 'description': f'Metrics {i}', 'category': 'Food', 'date': '2025-06-01'}).get_json()
+        client.put(f'/api/expenses/{created["id"]}', headers=headers, json={'amount': 13})
+        client.get('/api/dashboard', headers=headers)
+        client.get('/api/transactions?limit=5&include=summary', headers=headers)
+        client.get('/api/expenses?limit=50', headers=headers)
+        client.get('/api/chart/expense-categories', headers=headers)
+        client.get('/api/chart/expense-trends', headers=headers)
+        client.delete(f'/api/expenses/{created["id"]}', headers=headers)
+    for _ in range(max(1, args.rounds // 10)):
+        client.get('/api/report/pdf', headers=headers).close()
+
+    samples = parse_metrics(client.get('/metrics').get_data(as_text=True))
+    rows = defaultdict(dict)
+    for (name, labels), value in samples.items():
+        rows[labels[0]][name] = value
+
+    print(f"{'endpoint':<30} {'requests':>8} {'mean ms':>8} {'queries':>8} {'sql ms':>8} {'bytes':>9}")
+    for endpoint, row in sorted(rows.items()):
+        count = row.get('http_request_duration_seconds_count')
+        if not count or endpoint == 'metrics':
+            continue
+        size_count = row.get('http_response_size_bytes_count') or 1
+        print(f'{endpoint:<30} {count:>8.0f} '
+              f'{row["http_request_duration_seconds_sum"] / count * 1000:>8.2f} '
+              f'{row["db_queries_per_request_sum"] / count:>8.1f} '
+              f'{row["db_query_duration_seconds_sum"] / count * 1000:>8.2f} '
+              f'{row.get("http_response_size_bytes_sum", 0) / size_count:>9.0f}')
+    for kind in ('chart', 'pdf'):
+        row = rows.get(kind, {})
+        if row.get('render_duration_seconds_count'):
+            mean = row['render_duration_seconds_sum'] / row['render_duration_seconds_count'] * 1000
+            print(f'render {kind:<23} {row["render_duration_seconds_count"]:>8.0f} {mean:>8.2f}')
+
+    # Overhead: the request hooks run either way; the SQL listeners can be removed
+    metrics = expense_app.request_metrics
+    with expense_app.app.app_context():
+        engine = expense_app.db.engine
+    with_listeners = timeit(lambda: client.get('/api/budgets', headers=headers), repeat=2000)
+    event.remove(engine, 'before_cursor_execute', metrics._before_cursor_execute)
+    event.remove(engine, 'after_cursor_execute', metrics._after_cursor_execute)
+    without_listeners = timeit(lambda: client.get('/api/budgets', headers=headers), repeat=2000)
+    print(f'\nGET /api/budgets: {with_listeners:.3f} ms with SQL listeners, {without_listeners:.3f} ms without')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Login throughput at each password hashing cost.
+
+For every cost setting, a user is given a hash made with it and a login
+storm is run: --clients threads post logins through the Flask test client
+for --seconds. The script reports logins/sec (including 503s when the hasher
+is saturated) and the latency of a cheap authenticated request made while
+the storm runs, which shows whether logins starve other routes. The
+legacy unsalted SHA-256 row is the old format, for reference.
+
+    python benchmarks/bench_passwords.py [--clients 8] [--seconds 3]
+"""
+import argparse
+import threading
+import time
+
+from common import auth_headers, create_user, expense_app
+
+import passwords
+
+SETTINGS = [
+    ('legacy sha256', None),
+    ('pbkdf2 100k', dict(scheme='pbkdf2_sha256', pbkdf2_iterations=100000)),
+    ('pbkdf2 600k', dict(scheme='pbkdf2_sha256', pbkdf2_iterations=600000)),
+    ('scrypt n=2^14', dict(scheme='scrypt', scrypt_n=2 ** 14)),
+    ('scrypt n=2^15', dict(scheme='scrypt', scrypt_n=2 ** 15)),
+]
+
+
+class LegacyHasher(passwords.PasswordHasher):
+    """Verifies the stored legacy hashes without upgrading them on login."""
+
+    def needs_rehash(self, stored):
+        return False
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+def storm(user, headers, clients, seconds):
+    """Run concurrent logins; return (ok, busy, other-request latencies in ms)."""
+    counts = {'ok': 0, 'busy': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def login_loop():
+        client = expense_app.app.test_client()
+        while time.perf_counter() < deadline:
+            status = client.post('/api/auth/login', json={'username': user, 'password': user}).status_code
+            with lock:
+                counts['ok' if status == 200 else 'busy'] += 1
+
+    threads = [threading.Thread(target=login_loop) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+
+    # Meanwhile, an ordinary authenticated request every 20 ms
+    client = expense_app.app.test_client()
+    latencies = []
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        client.get('/api/budgets', headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join()
+    return counts['ok'], counts['busy'], latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+
+    configured = expense_app.password_hasher
+    headers = auth_headers(create_user('bench_passwords'))
+    print(f"{'setting':<15} {'logins/s':>9} {'503/s':>7} {'other p50 (ms)':>15} {'other p95 (ms)':>15}")
+    for i, (name, settings) in enumerate(SETTINGS):
+        user = f'bench_passwords_{i}'
+        user_id = create_user(user)
+        pool = dict(threads=configured.threads, max_pending=configured.max_pending)
+        if settings is None:
+            expense_app.password_hasher = LegacyHasher(**pool)
+            stored = passwords.legacy_sha256(user)
+        else:
+            expense_app.password_hasher = passwords.PasswordHasher(**pool, **settings)
+            stored = expense_app.password_hasher.hash(user)
+        with expense_app.app.app_context():
+            expense_app.db.session.get(expense_app.User, user_id).password_hash = stored
+            expense_app.db.session.commit()
+
+        ok, busy, latencies = storm(user, headers, args.clients, args.seconds)
+        print(f'{name:<15} {ok / args.seconds:>9.1f} {busy / args.seconds:>7.1f} '
+              f'{percentile(latencies, 50):>15.1f} {percentile(latencies, 95):>15.1f}')
+
+
+if __name__ == '__main__':
+    main()
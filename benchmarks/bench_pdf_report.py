@@ -0,0 +1,41 @@
+"""PDF report generation on a large ledger.
+
+Seeds one user with 100k expenses and 10k incomes (override with the first
+argument) and times GET /api/report/pdf, reporting output size and the
+peak Python heap allocation during the request. Rows are streamed, but
+ReportLab holds the finished pages until the PDF is saved, so the peak
+grows with the number of pages.
+
+    python benchmarks/bench_pdf_report.py [expenses]
+"""
+import sys
+import time
+import tracemalloc
+
+from common import auth_headers, create_user, expense_app, seed_ledger
+
+
+def main():
+    expenses = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    client = expense_app.app.test_client()
+
+    print(f"{'rows':>8} {'seconds':>8} {'pdf (KB)':>9} {'peak heap (MB)':>15}")
+    for size in sorted({expenses // 10, expenses}):
+        user_id = create_user(f'bench_pdf_{size}')
+        seed_ledger(user_id, expenses=size, incomes=size // 10, seed=size)
+        headers = auth_headers(user_id)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = client.get('/api/report/pdf', headers=headers)
+        pdf = response.get_data()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert response.status_code == 200, response.status_code
+        print(f'{size + size // 10:>8} {elapsed:>8.2f} {len(pdf) / 1024:>9.0f} {peak / 1024 / 1024:>15.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Monthly analytics from the rollup table versus scanning the ledger.
+
+Times the income-vs-expenses series (monthly sums for both tables) read from
+monthly_rollup, against the same GROUP BY over the raw rows, and the cost the
+rollup adds to a single-expense write.
+
+    python benchmarks/bench_rollup.py
+"""
+from sqlalchemy import func
+
+from common import auth_headers, create_user, expense_app, seed_ledger, timeit
+
+SIZES = [1000, 10000, 100000]
+
+
+def ledger_monthly_totals(user_id):
+    totals = {}
+    for model in (expense_app.Expense, expense_app.Income):
+        month = expense_app.db_config.month_bucket(model.date)
+        totals[model.__tablename__] = expense_app.db.session.query(month, func.sum(model.amount_cents)) \
+            .filter(model.user_id == user_id) \
+            .group_by(month) \
+            .all()
+    return totals
+
+
+def main():
+    client = expense_app.app.test_client()
+    print(f"{'rows':>8} {'rollup (ms)':>12} {'ledger (ms)':>12} {'write (ms)':>11}")
+    for size in SIZES:
+        user_id = create_user(f'bench_rollup_{size}')
+        seed_ledger(user_id, expenses=size, incomes=size // 10, seed=size)
+        headers = auth_headers(user_id)
+
+        with expense_app.app.app_context():
+            rollup_ms = timeit(lambda: expense_app.get_income_vs_expenses(user_id))
+            ledger_ms = timeit(lambda: ledger_monthly_totals(user_id), repeat=5)
+        write_ms = timeit(lambda: client.post('/api/expenses', headers=headers, json={
+            'amount': 10, 'description': 'Bench', 'category': 'Food'}))
+        print(f'{size:>8} {rollup_ms:>12.2f} {ledger_ms:>12.2f} {write_ms:>11.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Full-text search latency on a large ledger.
+
+Seeds one user with N expenses whose descriptions are drawn from a
+merchant-like vocabulary, skewed so that some words are common and most are
+rare, plus a second user whose rows the search must skip. It then times
+/api/search for a rare word, a common word, a short prefix, two words
+and a date-filtered query, and compares them with a LIKE scan of the same
+ledger. The insert time includes the FTS triggers.
+
+    python benchmarks/bench_search.py [--rows 1000000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from common import CATEGORIES, auth_headers, create_user, expense_app, timeit
+
+PREFIXES = ['Corner', 'City', 'Green', 'Blue', 'North', 'Golden', 'Urban', 'Royal', 'Sunny', 'Metro']
+KINDS = ['Market', 'Cafe', 'Pharmacy', 'Bakery', 'Garage', 'Books', 'Cinema', 'Pizza', 'Hardware', 'Florist']
+QUERIES = {
+    'rare word': 'zephyr',
+    'common word': 'market',
+    'prefix': 'bak',
+    'two words': 'green caf',
+    'date range': 'pizza&start_date=2025-06-01&end_date=2025-06-30',
+}
+
+
+def description(rng, i):
+    # Mostly "<prefix> <kind>", with a rare word every ~10,000 rows and a
+    # unique reference token on each row so the vocabulary keeps growing
+    words = [rng.choice(PREFIXES), rng.choice(KINDS), f'ref{i}']
+    if rng.random() < 0.0001:
+        words.append('Zephyr')
+    return ' '.join(words)
+
+
+def seed(user_id, rows, rng):
+    start = datetime(2024, 1, 1)
+    batch = []
+    for i in range(rows):
+        batch.append({
+            'user_id': user_id,
+            'amount_cents': rng.randint(100, 50000),
+            'description': description(rng, i),
+            'category': rng.choice(CATEGORIES),
+            'date': start + timedelta(days=rng.randrange(730), seconds=rng.randrange(86400)),
+        })
+        if len(batch) == 10000 or i == rows - 1:
+            expense_app.db.session.execute(expense_app.Expense.__table__.insert(), batch)
+            batch = []
+    expense_app.db.session.commit()
+
+
+def like_search(user_id, word):
+    Expense = expense_app.Expense
+    return expense_app.db.session.execute(
+        select(Expense.id).where(Expense.user_id == user_id, Expense.description.ilike(f'%{word}%'))
+        .order_by(Expense.date.desc()).limit(50)
+    ).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    user_id = create_user('bench_search')
+    other_id = create_user('bench_search_other')
+    with expense_app.app.app_context():
+        started = time.perf_counter()
+        seed(user_id, args.rows, rng)
+        seed(other_id, args.rows // 10, rng)
+        insert_s = time.perf_counter() - started
+    print(f'seeded {args.rows + args.rows // 10} rows in {insert_s:.1f} s (FTS triggers included)')
+
+    client = expense_app.app.test_client()
+    headers = auth_headers(user_id)
+    print(f"{'query':<12} {'matches':>8} {'search (ms)':>12} {'LIKE (ms)':>10}")
+    for name, query in QUERIES.items():
+        url = f'/api/search?q={query}&type=expense'
+        page = client.get(url, headers=headers).get_json()
+        matches = len(page['items']) if not page['nextCursor'] else '50+'
+        search_ms = timeit(lambda: client.get(url, headers=headers), repeat=10)
+        with expense_app.app.app_context():
+            like_ms = timeit(lambda: like_search(user_id, query.split('&')[0].split()[0]), repeat=3)
+        print(f'{name:<12} {matches:>8} {search_ms:>12.1f} {like_ms:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
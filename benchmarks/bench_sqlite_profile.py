@@ -0,0 +1,112 @@
+"""Concurrent reads and writes under each SQLite profile.
+
+Starts several processes per profile (like gunicorn workers) against a fresh
+database file: writers add expenses, readers load the dashboard and the first
+page of the expense list. Reports the throughput of each role and how many
+requests failed, e.g. with "database is locked".
+
+    python benchmarks/bench_sqlite_profile.py [--readers 4] [--writers 2] [--seconds 5]
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app(database_path, profile):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + database_path
+    os.environ['DB_PROFILE'] = profile
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+        sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+    import app as expense_app
+    # Failed requests are counted, not logged
+    expense_app.app.logger.setLevel(logging.CRITICAL)
+    return expense_app
+
+
+def seed(database_path, profile):
+    load_app(database_path, profile)
+    from common import create_user, seed_ledger
+    user_id = create_user('bench_profile')
+    seed_ledger(user_id, expenses=20000, incomes=2000)
+    return user_id
+
+
+def worker(database_path, profile, role, user_id, seconds, start_at):
+    expense_app = load_app(database_path, profile)
+    from common import auth_headers
+    client = expense_app.app.test_client()
+    headers = auth_headers(user_id)
+    ok = failed = 0
+    while time.time() < start_at:
+        time.sleep(0.001)
+    deadline = start_at + seconds
+    latencies = []
+    while time.time() < deadline:
+        started = time.perf_counter()
+        try:
+            if role == 'writer':
+                response = client.post('/api/expenses', headers=headers, json={
+                    'amount': 12.5, 'description': 'Bench', 'category': 'Food'})
+                success = response.status_code == 201
+            else:
+                success = (client.get('/api/dashboard', headers=headers).status_code == 200
+                           and client.get('/api/expenses?limit=50', headers=headers).status_code == 200)
+        except Exception:
+            success = False
+        latencies.append(time.perf_counter() - started)
+        if success:
+            ok += 1
+        else:
+            failed += 1
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0
+    return role, ok, failed, p95
+
+
+def run_profile(profile, args):
+    database_path = os.path.join(tempfile.mkdtemp(prefix='expense-bench-'), 'profile.db')
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        user_id = pool.apply(seed, (database_path, profile))
+
+    roles = ['writer'] * args.writers + ['reader'] * args.readers
+    with context.Pool(len(roles)) as pool:
+        # Give every process time to import the app before the clock starts
+        start_at = time.time() + 5
+        results = pool.starmap(worker, [(database_path, profile, role, user_id, args.seconds, start_at)
+                                        for role in roles])
+
+    totals = {}
+    for role, ok, failed, p95 in results:
+        entry = totals.setdefault(role, [0, 0, 0.0])
+        entry[0] += ok
+        entry[1] += failed
+        entry[2] = max(entry[2], p95)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{'profile':>12} {'role':>7} {'req/s':>8} {'failed':>7} {'p95 (ms)':>9}")
+    for profile in ('default', 'performance'):
+        totals = run_profile(profile, args)
+        for role in ('writer', 'reader'):
+            ok, failed, p95 = totals[role]
+            print(f'{profile:>12} {role:>7} {ok / args.seconds:>8.1f} {failed:>7} {p95:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
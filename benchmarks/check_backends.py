@@ -0,0 +1,196 @@
+"""Run the same API scenario against SQLite and PostgreSQL and compare.
+
+Each backend runs in a fresh interpreter (the app reads DATABASE_URL at
+import) on an empty database: a user is registered, a budget is set,
+transactions are added, updated across months and categories, deleted, bulk
+imported and batch edited, and then every read endpoint is captured. The
+check fails if any backend errors, if its monthly rollup disagrees with its
+ledger, or if the responses differ between backends.
+
+PostgreSQL is either given with --postgres-url or started in-process from a
+temporary data directory with testing.postgresql (needs the PostgreSQL server
+binaries) or pgserver, whichever is installed. Without any of them only SQLite
+is checked.
+
+    python benchmarks/check_backends.py [--postgres-url postgresql://...]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EXPENSES = [
+    {'amount': 12.5, 'description': 'Lunch', 'category': 'Food', 'date': '2025-01-03T12:00:00'},
+    {'amount': 1200, 'description': 'January rent', 'category': 'Rent', 'date': '2025-01-01T09:00:00'},
+    {'amount': 45.25, 'description': 'Train', 'category': 'Transportation', 'date': '2025-02-14T08:30:00'},
+    {'amount': 80, 'description': 'Concert', 'category': 'Entertainment', 'date': '2025-02-20T20:00:00'},
+    {'amount': 9.75, 'description': 'Coffee beans', 'category': 'Food', 'date': '2025-03-02T10:15:00'},
+]
+INCOME = [
+    {'amount': 3000, 'description': 'Salary', 'date': '2025-01-31T17:00:00'},
+    {'amount': 450.5, 'description': 'Freelance Work', 'date': '2025-02-10T11:00:00'},
+    {'amount': 3000, 'description': 'Salary', 'date': '2025-02-28T17:00:00'},
+]
+IMPORT_CSV = ('amount,description,category,date\n'
+              '15.5,Groceries,Food,2025-03-05\n'
+              '60,Shoes,Shopping,2025-03-09\n'
+              'oops,Broken row,Food,2025-03-10\n')
+CHARTS = ['expense-categories', 'income-sources', 'income-by-month',
+          'expense-trends', 'daily-expenses', 'income-vs-expenses']
+
+
+def run_scenario():
+    """Drive the app in this process and return every captured response."""
+    import app as expense_app
+
+    client = expense_app.app.test_client()
+    captured = {}
+
+    def record(name, response):
+        captured[name] = {'status': response.status_code, 'body': response.get_json()}
+        return response.get_json()
+
+    record('register', client.post('/api/auth/register', json={
+        'username': 'alice', 'email': 'alice@example.com', 'password': 'secret'}))
+    login = client.post('/api/auth/login', json={'username': 'alice', 'password': 'secret'}).get_json()
+    headers = {'Authorization': f"Bearer {login['token']}"}
+
+    record('budget', client.put('/api/budgets/Food', headers=headers, json={'amount': 20}))
+    expense_ids = [record(f'add-expense-{i}', client.post('/api/expenses', headers=headers, json=expense))['id']
+                   for i, expense in enumerate(EXPENSES)]
+    income_ids = [record(f'add-income-{i}', client.post('/api/income', headers=headers, json=income))['id']
+                  for i, income in enumerate(INCOME)]
+
+    # Move an expense to another month and category, then delete one of each
+    record('update-expense', client.put(f'/api/expenses/{expense_ids[0]}', headers=headers, json={
+        'amount': 14, 'category': 'Shopping', 'date': '2025-02-01T12:00:00'}))
+    record('update-income', client.put(f'/api/income/{income_ids[1]}', headers=headers, json={
+        'description': 'Consulting'}))
+    record('delete-expense', client.delete(f'/api/expenses/{expense_ids[3]}', headers=headers))
+    record('delete-income', client.delete(f'/api/income/{income_ids[2]}', headers=headers))
+
+    record('import', client.post('/api/expenses/import', headers=headers,
+                                 data=IMPORT_CSV, content_type='text/csv'))
+    record('batch', client.post('/api/transactions/batch', headers=headers, json={'operations': [
+        {'op': 'update', 'type': 'expense', 'id': expense_ids[1], 'fields': {'category': 'Housing'}},
+        {'op': 'update', 'type': 'expense', 'id': expense_ids[2], 'fields': {'date': '2025-03-15T08:30:00'}},
+        {'op': 'delete', 'type': 'income', 'id': income_ids[0]},
+        {'op': 'delete', 'type': 'expense', 'id': 999999},
+    ]}))
+
+    record('budget-status', client.get('/api/budgets/status?month=2025-03', headers=headers))
+    record('dashboard', client.get('/api/dashboard', headers=headers))
+    for chart in CHARTS:
+        record(f'chart-data/{chart}', client.get(f'/api/chart-data/{chart}', headers=headers))
+    page = record('expenses-page-1', client.get('/api/expenses?limit=3', headers=headers))
+    record('expenses-page-2', client.get(f"/api/expenses?limit=3&cursor={page['nextCursor']}", headers=headers))
+    record('expenses-filtered', client.get(
+        '/api/expenses?category=Food&start_date=2025-03-01&min_amount=10', headers=headers))
+    record('income', client.get('/api/income', headers=headers))
+    page = record('feed-page-1', client.get('/api/transactions?limit=4&include=summary', headers=headers))
+    record('feed-page-2', client.get(f"/api/transactions?limit=4&cursor={page['nextCursor']}", headers=headers))
+    record('feed-filtered', client.get('/api/transactions?category=Food&start_date=2025-02-01', headers=headers))
+    record('search', client.get('/api/search?q=sal', headers=headers))
+    record('search-expenses', client.get('/api/search?q=foo&type=expense&start_date=2025-03-01', headers=headers))
+    page = record('search-page-1', client.get('/api/search?q=e&limit=2', headers=headers))
+    record('search-page-2', client.get(f"/api/search?q=e&limit=2&cursor={page['nextCursor']}", headers=headers))
+    captured['export'] = client.get('/api/export?format=ndjson', headers=headers).get_data(as_text=True)
+
+    with expense_app.app.app_context():
+        captured['rollup-mismatches'] = expense_app.verify_rollups()
+    return captured
+
+
+def run_backend(database_url):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    env.setdefault('SECRET_KEY', 'check-backends')
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--run'],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def start_postgres():
+    """Start a throwaway PostgreSQL server; returns (url, stop) or None."""
+    try:
+        import testing.postgresql
+        server = testing.postgresql.Postgresql()
+        return server.url(), server.stop
+    except ImportError:
+        pass
+    try:
+        import pgserver
+    except ImportError:
+        return None
+    server = pgserver.get_server(tempfile.mkdtemp(prefix='expense-pg-'), cleanup_mode='stop')
+    server.psql('CREATE DATABASE expense_check;')
+    # pgserver names the psycopg 3 driver; use the default driver instead
+    url = 'postgresql://' + server.get_uri('expense_check').split('://', 1)[1]
+    return url, server.cleanup
+
+
+def diff(left, right, path=''):
+    if isinstance(left, dict) and isinstance(right, dict):
+        for key in sorted(set(left) | set(right), key=str):
+            yield from diff(left.get(key), right.get(key), f'{path}/{key}')
+    elif isinstance(left, list) and isinstance(right, list) and len(left) == len(right):
+        for i, (a, b) in enumerate(zip(left, right)):
+            yield from diff(a, b, f'{path}[{i}]')
+    elif left != right:
+        yield f'{path}: {left!r} != {right!r}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--postgres-url', help='use this (empty) PostgreSQL database')
+    parser.add_argument('--run', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        sys.path.insert(0, ROOT)
+        print(json.dumps(run_scenario()))
+        return
+
+    backends = {'sqlite': 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='expense-check-'), 'check.db')}
+    stop = None
+    if args.postgres_url:
+        backends['postgresql'] = args.postgres_url
+    else:
+        started = start_postgres()
+        if started:
+            backends['postgresql'], stop = started
+        else:
+            print('PostgreSQL not available (install testing.postgresql or pgserver); checking SQLite only')
+
+    failures = []
+    results = {}
+    try:
+        for name, url in backends.items():
+            try:
+                results[name] = run_backend(url)
+            except RuntimeError as e:
+                failures.append(f'{name}: {e}')
+                continue
+            for mismatch in results[name]['rollup-mismatches']:
+                failures.append(f'{name}: rollup differs from ledger: {mismatch}')
+            print(f'{name}: scenario completed')
+    finally:
+        if stop:
+            stop()
+
+    if len(results) == 2:
+        failures.extend(f'sqlite vs postgresql {line}' for line in diff(results['sqlite'], results['postgresql']))
+
+    for failure in failures:
+        print(failure)
+    print('OK' if not failures else f'{len(failures)} problems')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
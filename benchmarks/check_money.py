@@ -0,0 +1,107 @@
+"""Randomised check that balances stay exact to the cent.
+
+For each seed a fresh user runs a random sequence of adds, amount updates,
+deletes and batch deletes through the API, with amounts chosen to be awkward
+in binary floating point (0.1, 0.2, 1234567.89, ...). This stands in for a
+property-based test, since the project has no test suite. After
+every step the dashboard totals must equal the exact decimal sum of the
+transactions still present, and at the end the monthly rollup must match the
+ledger. Exits with status 1 and the failing seed on the first violation.
+
+    python benchmarks/check_money.py [--seeds 100] [--steps 60]
+"""
+import argparse
+import random
+import sys
+from decimal import Decimal
+
+from common import auth_headers, create_user, expense_app
+
+AWKWARD_AMOUNTS = ['0.1', '0.2', '0.3', '0.7', '1.1', '2.675', '19.99', '33.33', '1234567.89', '0.01']
+CATEGORIES = ['Food', 'Rent', 'Travel']
+
+
+def random_amount(rng):
+    if rng.random() < 0.5:
+        return rng.choice(AWKWARD_AMOUNTS)
+    return f'{rng.randint(0, 99999)}.{rng.randint(0, 99):02d}'
+
+
+def cents(amount):
+    return int((Decimal(amount) * 100).to_integral_value(rounding='ROUND_HALF_UP'))
+
+
+def run(seed, steps):
+    rng = random.Random(seed)
+    client = expense_app.app.test_client()
+    user_id = create_user(f'money_{seed}')
+    headers = auth_headers(user_id)
+    ledger = {'expenses': {}, 'income': {}}  # URL kind -> {id: cents}
+
+    def add(kind):
+        amount = random_amount(rng)
+        body = {'amount': float(amount) if rng.random() < 0.5 else amount,
+                'description': rng.choice(['Salary', 'Bonus', 'Misc']),
+                'category': rng.choice(CATEGORIES),
+                'date': f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}'}
+        response = client.post(f'/api/{kind}', headers=headers, json=body)
+        ledger[kind][response.get_json()['id']] = cents(amount)
+
+    def update(kind):
+        id = rng.choice(list(ledger[kind]))
+        amount = random_amount(rng)
+        client.put(f'/api/{kind}/{id}', headers=headers, json={'amount': amount, 'date': '2024-06-15'})
+        ledger[kind][id] = cents(amount)
+
+    def delete(kind):
+        id = rng.choice(list(ledger[kind]))
+        client.delete(f'/api/{kind}/{id}', headers=headers)
+        del ledger[kind][id]
+
+    def batch_delete(kind):
+        ids = rng.sample(list(ledger[kind]), min(3, len(ledger[kind])))
+        client.post('/api/transactions/batch', headers=headers, json={
+            'operations': [{'op': 'delete', 'type': 'expense' if kind == 'expenses' else 'income', 'id': id}
+                           for id in ids]})
+        for id in ids:
+            del ledger[kind][id]
+
+    for step in range(steps):
+        kind = rng.choice(['expenses', 'income'])
+        action = rng.choice([add, add, add, update, delete, batch_delete]) if ledger[kind] else add
+        action(kind)
+
+        summary = client.get('/api/dashboard', headers=headers).get_json()
+        expected = {
+            'totalExpenses': sum(ledger['expenses'].values()),
+            'totalIncome': sum(ledger['income'].values()),
+        }
+        expected['balance'] = expected['totalIncome'] - expected['totalExpenses']
+        for name, want in expected.items():
+            have = cents(repr(summary[name]))
+            if have != want:
+                return f'step {step} ({action.__name__} {kind}): {name} is {summary[name]}, expected {want / 100:.2f}'
+
+    with expense_app.app.app_context():
+        mismatches = expense_app.verify_rollups(user_id)
+    if mismatches:
+        return f'rollup differs from ledger: {mismatches[0]}'
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seeds', type=int, default=100)
+    parser.add_argument('--steps', type=int, default=60)
+    args = parser.parse_args()
+
+    for seed in range(args.seeds):
+        failure = run(seed, args.steps)
+        if failure:
+            print(f'seed {seed}: {failure}')
+            sys.exit(1)
+    print(f'{args.seeds} seeds x {args.steps} steps: all balances exact')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Shared setup for the benchmark scripts.
+
+Importing this module points the app at a throwaway SQLite database (unless
+DATABASE_URL is already set) and gives it a fixed token signing key, so
+benchmarks never touch the instance folder.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+if not os.environ.get('DATABASE_URL'):
+    _db_dir = tempfile.mkdtemp(prefix='expense-bench-')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_db_dir, 'bench.db')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import app as expense_app  # noqa: E402
+
+CATEGORIES = ['Food', 'Rent', 'Transportation', 'Entertainment', 'Shopping',
+              'Healthcare', 'Insurance', 'Travel', 'Other']
+INCOME_SOURCES = ['Salary', 'Freelance Work', 'Bonus', 'Dividends']
+
+
+def create_user(username):
+    with expense_app.app.app_context():
+        user = expense_app.User(
+            username=username,
+            email=f'{username}@example.com',
+            password_hash=expense_app.password_hasher.hash(username)
+        )
+        expense_app.db.session.add(user)
+        expense_app.db.session.commit()
+        return user.id
+
+
+def auth_headers(user_id):
+    """Request headers authenticating as the user, as after a login."""
+    token, _ = expense_app.token_signer.issue(user_id)
+    return {'Authorization': f'Bearer {token}'}
+
+
+def seed_ledger(user_id, expenses, incomes=0, seed=0, days=730):
+    """Bulk-insert random transactions for one user."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    expense_rows = [{
+        'user_id': user_id,
+        'amount_cents': rng.randint(100, 50000),
+        'description': f'Expense {i}',
+        'category': rng.choice(CATEGORIES),
+        'date': start + timedelta(days=rng.randrange(days), seconds=rng.randrange(86400))
+    } for i in range(expenses)]
+    income_rows = [{
+        'user_id': user_id,
+        'amount_cents': rng.randint(10000, 500000),
+        'description': rng.choice(INCOME_SOURCES),
+        'date': start + timedelta(days=rng.randrange(days), seconds=rng.randrange(86400))
+    } for _ in range(incomes)]
+    with expense_app.app.app_context():
+        session = expense_app.db.session
+        if expense_rows:
+            session.execute(expense_app.Expense.__table__.insert(), expense_rows)
+        if income_rows:
+            session.execute(expense_app.Income.__table__.insert(), income_rows)
+        session.commit()
+        # The raw inserts bypass the write routes, so refresh the user's rollup
+        expense_app.rebuild_rollups(user_id)
+
+
+def timeit(fn, repeat=20):
+    """Return the median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
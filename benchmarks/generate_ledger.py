@@ -0,0 +1,128 @@
+"""Deterministic synthetic ledger for load tests.
+
+Bulk-loads --users users with --transactions transactions each straight
+into the database (about one in ten is income), spread over the categories
+and two years of dates, then builds the monthly rollup. The same arguments
+always produce the same users, ids, amounts, descriptions and dates (only
+the password salt differs), so load test runs on different commits see
+identical data. Every user's password is "loadtest".
+
+    python benchmarks/generate_ledger.py --database /tmp/ledger.db [--users 20] [--transactions 5000] [--seed 0]
+
+The database must be new or empty; with --database unset, DATABASE_URL is
+used. loadtest.py calls generate() itself when it is given an empty
+database.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+PASSWORD = 'loadtest'
+START = datetime(2024, 1, 1)
+DAYS = 730
+INCOME_SHARE = 0.1
+BATCH = 10000
+
+# Descriptions are drawn per category so that search has realistic words
+MERCHANTS = {
+    'Food': ['Groceries', 'Supermarket', 'Bakery', 'Coffee shop', 'Pizza delivery', 'Farmers market'],
+    'Rent': ['Monthly rent', 'Parking space', 'Storage unit'],
+    'Transportation': ['Bus pass', 'Train ticket', 'Fuel', 'Taxi', 'Bike repair'],
+    'Entertainment': ['Cinema', 'Concert tickets', 'Streaming subscription', 'Board games'],
+    'Shopping': ['Clothing', 'Electronics', 'Books', 'Home supplies'],
+    'Healthcare': ['Pharmacy', 'Dentist', 'Doctor visit', 'Gym membership'],
+    'Insurance': ['Car insurance', 'Health insurance', 'Home insurance'],
+    'Travel': ['Flight', 'Hotel', 'Car rental', 'Museum tickets'],
+    'Other': ['Gift', 'Donation', 'Bank fees', 'Haircut'],
+}
+# Typical amount range per category, in cents
+AMOUNTS = {
+    'Food': (200, 15000), 'Rent': (50000, 250000), 'Transportation': (150, 12000),
+    'Entertainment': (500, 20000), 'Shopping': (800, 60000), 'Healthcare': (1000, 40000),
+    'Insurance': (3000, 30000), 'Travel': (5000, 150000), 'Other': (100, 20000),
+}
+INCOME_SOURCES = ['Salary', 'Freelance Work', 'Bonus', 'Dividends', 'Interest', 'Refund']
+
+
+def user_rows(index, count, seed):
+    """(expense rows, income rows) for the index-th user, without user_id."""
+    rng = random.Random(seed * 1000003 + index)
+    categories = list(MERCHANTS)
+    # Each user spends in their own mix of categories
+    weights = [rng.random() + 0.1 for _ in categories]
+    expenses, incomes = [], []
+    for _ in range(count):
+        date = START + timedelta(days=rng.randrange(DAYS), seconds=rng.randrange(86400))
+        if rng.random() < INCOME_SHARE:
+            incomes.append({
+                'amount_cents': rng.randint(10000, 600000),
+                'description': rng.choice(INCOME_SOURCES),
+                'date': date,
+            })
+        else:
+            category = rng.choices(categories, weights)[0]
+            expenses.append({
+                'amount_cents': rng.randint(*AMOUNTS[category]),
+                'description': rng.choice(MERCHANTS[category]),
+                'category': category,
+                'date': date,
+            })
+    return expenses, incomes
+
+
+def generate(expense_app, users, transactions, seed=0, log=None):
+    """Load the ledger into the app's database; returns the user ids in order."""
+    db = expense_app.db
+    with expense_app.app.app_context():
+        if db.session.query(expense_app.User.id).first() is not None:
+            raise SystemExit('The database already has users; generate into a new database')
+        password_hash = expense_app.password_hasher.hash(PASSWORD)
+        user_ids = []
+        for index in range(users):
+            user = expense_app.User(username=f'loadtest{index}', email=f'loadtest{index}@example.com',
+                                    password_hash=password_hash, created_at=START)
+            db.session.add(user)
+            db.session.flush()
+            user_ids.append(user.id)
+
+            expenses, incomes = user_rows(index, transactions, seed)
+            for model, rows in ((expense_app.Expense, expenses), (expense_app.Income, incomes)):
+                for row in rows:
+                    row['user_id'] = user.id
+                for start in range(0, len(rows), BATCH):
+                    db.session.execute(model.__table__.insert(), rows[start:start + BATCH])
+            db.session.commit()
+            if log:
+                log(f'user {index + 1}/{users}: {len(expenses)} expenses, {len(incomes)} incomes')
+        # The raw inserts bypass the write routes, so build the rollup at the end
+        expense_app.rebuild_rollups()
+    return user_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', help='SQLite file to create (default: DATABASE_URL)')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--transactions', type=int, default=5000, help='Transactions per user')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.database:
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.abspath(args.database)
+    elif not os.environ.get('DATABASE_URL'):
+        parser.error('pass --database or set DATABASE_URL')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    from common import expense_app
+
+    start = time.perf_counter()
+    generate(expense_app, args.users, args.transactions, args.seed,
+             log=lambda message: print(message, file=sys.stderr))
+    print(f'{args.users * args.transactions} transactions for {args.users} users '
+          f'in {time.perf_counter() - start:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+"""Reproducible load test with JSON results.
+
+Runs fixed request scenarios against the app and reports, per scenario,
+throughput and p50/p95/p99 latency as JSON, together with the commit, the
+machine and the settings, so that runs on different commits can be
+compared (--compare prints the change against an earlier result file).
+
+Targets:
+  client    the Flask test client in this process (default)
+  gunicorn  a local gunicorn started on a free port (--workers, --threads)
+  --url     an already running server that shares the database and SECRET_KEY
+
+The data comes from generate_ledger.py: --database names an SQLite file,
+which is generated first if it does not exist (--users, --transactions,
+--seed). Without --database a temporary one is generated for the run.
+
+Scenarios: dashboard, dashboard-ui (the single request the web UI makes),
+chart:<name> for each chart, listing, feed, search, pdf and crud (create,
+update and delete an expense, three requests per iteration). Each scenario
+sends --requests iterations from --concurrency threads after --warmup
+untimed ones, cycling through the users in a fixed order. Charts are cached
+per user, so after the warm-up they measure cache hits; --cold-charts adds
+a unique query parameter to every chart request to measure rendering.
+
+    python benchmarks/loadtest.py [--target gunicorn] [--database /tmp/ledger.db]
+        [--scenarios dashboard,pdf] [--output results.json] [--compare old.json]
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHARTS = ['expense-categories', 'income-sources', 'income-by-month', 'expense-trends',
+          'daily-expenses', 'income-vs-expenses']
+SECRET_KEY = 'loadtest'
+
+
+def crud(send, user, i):
+    status, body = send('POST', '/api/expenses', user, {
+        'amount': 10 + i % 90, 'description': f'Load test {i}', 'category': 'Food', 'date': '2025-06-15'})
+    if status != 201:
+        return
+    expense_id = json.loads(body)['id']
+    send('PUT', f'/api/expenses/{expense_id}', user, {'amount': 20 + i % 90})
+    send('DELETE', f'/api/expenses/{expense_id}', user)
+
+
+def build_scenarios(cold_charts):
+    """{name: fn(send, user, iteration)}; each fn sends one or more requests."""
+    def get(path):
+        return lambda send, user, i: send('GET', path, user)
+
+    def chart(name):
+        if cold_charts:
+            return lambda send, user, i: send('GET', f'/api/chart/{name}?run={i}', user)
+        return get(f'/api/chart/{name}')
+
+    scenarios = {
+        'dashboard': get('/api/dashboard'),
+        'dashboard-ui': get('/api/transactions?limit=5&include=summary'),
+    }
+    for name in CHARTS:
+        scenarios[f'chart:{name}'] = chart(name)
+    scenarios.update({
+        'listing': get('/api/expenses?limit=50'),
+        'feed': get('/api/transactions?limit=50'),
+        'search': get('/api/search?q=groc&limit=20'),
+        'pdf': get('/api/report/pdf'),
+        'crud': crud,
+    })
+    return scenarios
+
+
+class ClientTransport:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, headers, body):
+        response = self.client.open(path, method=method, headers=headers, data=body)
+        data = response.get_data()
+        response.close()
+        return response.status_code, data
+
+
+class HttpTransport:
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.connection = None
+
+    def request(self, method, path, headers, body):
+        # Keep the connection open where the server allows it (gunicorn's
+        # sync workers close it after every response)
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(self.host, self.port, timeout=120)
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (ConnectionError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            raise
+        if response.will_close:
+            self.connection.close()
+            self.connection = None
+        return response.status, data
+
+
+def percentile(samples, p):
+    """Linearly interpolated percentile of sorted samples."""
+    if not samples:
+        return None
+    position = (len(samples) - 1) * p / 100
+    low = int(position)
+    high = min(low + 1, len(samples) - 1)
+    return samples[low] + (samples[high] - samples[low]) * (position - low)
+
+
+def run_scenario(scenario, make_transport, users, headers, requests, warmup, concurrency):
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    next_iteration = [0]
+
+    def worker(record):
+        transport = make_transport()
+
+        def send(method, path, user, payload=None):
+            request_headers = dict(headers[user])
+            body = None
+            if payload is not None:
+                body = json.dumps(payload).encode()
+                request_headers['Content-Type'] = 'application/json'
+            start = time.perf_counter()
+            try:
+                status, data = transport.request(method, path, request_headers, body)
+            except (OSError, http.client.HTTPException):
+                status, data = None, b''
+            elapsed = (time.perf_counter() - start) * 1000
+            if record:
+                with lock:
+                    latencies.append(elapsed)
+                    if status is None or status >= 400:
+                        errors[0] += 1
+            return status, data
+
+        # Warm-up iterations are numbered after the timed ones, so that
+        # --cold-charts never times a URL the warm-up already rendered
+        total, offset = (requests, 0) if record else (warmup, requests)
+        while True:
+            with lock:
+                i = next_iteration[0]
+                next_iteration[0] += 1
+            if i >= total:
+                return
+            scenario(send, users[(offset + i) % len(users)], offset + i)
+
+    # The warm-up fills connection pools, lazy imports and caches
+    if warmup:
+        worker(False)
+        next_iteration[0] = 0
+    threads = [threading.Thread(target=worker, args=(True,)) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'iterations': requests,
+        'requests': len(latencies),
+        'errors': errors[0],
+        'seconds': round(seconds, 3),
+        'throughput_rps': round(len(latencies) / seconds, 2) if seconds else None,
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies), 3) if latencies else None,
+            **{f'p{p}': round(percentile(latencies, p), 3) if latencies else None for p in (50, 95, 99)},
+            'max': round(latencies[-1], 3) if latencies else None,
+        },
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(workers, threads, env):
+    port = free_port()
+    command = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+               '--threads', str(threads), '--timeout', '120', '--log-level', 'warning', 'app:app']
+    process = subprocess.Popen(command, cwd=ROOT, env=env)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f'gunicorn exited with status {process.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return process, f'http://127.0.0.1:{port}'
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit('gunicorn did not start within 60 seconds')
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return {'commit': commit, 'dirty': bool(dirty)}
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+
+
+def compare(previous, current):
+    """Print each scenario's throughput and latency next to an earlier run's."""
+    def change(old, new):
+        if old is None or new is None:
+            return f'{"-":>22}'
+        delta = f'{(new - old) / old * 100:+.0f}%' if old else ''
+        return f'{old:>8.1f} -> {new:>8.1f} {delta:>5}'
+
+    print(f'Compared with {previous["meta"].get("commit")} ({previous["meta"].get("timestamp")}):', file=sys.stderr)
+    for key in ('target', 'concurrency', 'cold_charts', 'dataset', 'cpus'):
+        if previous['meta'].get(key) != current['meta'].get(key):
+            print(f'  note: {key} differs: {previous["meta"].get(key)} -> {current["meta"].get(key)}', file=sys.stderr)
+    print(f"{'scenario':<28} {'req/s':>24} {'p50 ms':>24} {'p95 ms':>24} {'p99 ms':>24}", file=sys.stderr)
+    for name, result in current['scenarios'].items():
+        old = previous['scenarios'].get(name)
+        if old is None:
+            continue
+        columns = [change(old['throughput_rps'], result['throughput_rps'])]
+        columns += [change(old['latency_ms'][p], result['latency_ms'][p]) for p in ('p50', 'p95', 'p99')]
+        print(f'{name:<28} ' + ' '.join(f'{column:>24}' for column in columns), file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', choices=['client', 'gunicorn'], default='client')
+    parser.add_argument('--url', help='Base URL of a running server (overrides --target)')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=1, help='Threads per gunicorn worker')
+    parser.add_argument('--database', help='SQLite ledger file, generated if missing')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--transactions', type=int, default=2000, help='Transactions per user')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scenarios', help='Comma-separated scenario names (default: all)')
+    parser.add_argument('--requests', type=int, default=50, help='Timed iterations per scenario')
+    parser.add_argument('--pdf-requests', type=int, default=5, help='Timed iterations of the pdf scenario')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--cold-charts', action='store_true', help='Bypass the chart cache')
+    parser.add_argument('--output', help='Write the JSON here instead of stdout')
+    parser.add_argument('--compare', help='Earlier JSON result to compare against')
+    args = parser.parse_args()
+
+    scenarios = build_scenarios(args.cold_charts)
+    names = args.scenarios.split(',') if args.scenarios else list(scenarios)
+    unknown = [name for name in names if name not in scenarios]
+    if unknown:
+        parser.error(f'unknown scenarios {", ".join(unknown)}; choose from {", ".join(scenarios)}')
+
+    database = args.database or os.path.join(tempfile.mkdtemp(prefix='expense-loadtest-'), 'ledger.db')
+    database = os.path.abspath(database)
+    generated = not os.path.exists(database)
+    os.makedirs(os.path.dirname(database), exist_ok=True)
+    os.environ['DATABASE_URL'] = 'sqlite:///' + database
+    os.environ['SECRET_KEY'] = SECRET_KEY
+    from common import expense_app
+    import generate_ledger
+
+    log = lambda message: print(message, file=sys.stderr)  # noqa: E731
+    if generated:
+        log(f'Generating {args.users} x {args.transactions} transactions into {database}')
+        generate_ledger.generate(expense_app, args.users, args.transactions, args.seed)
+    with expense_app.app.app_context():
+        users = expense_app.db.session.scalars(
+            expense_app.db.select(expense_app.User.id).order_by(expense_app.User.id)).all()
+        transactions = (expense_app.db.session.query(expense_app.Expense).count()
+                        + expense_app.db.session.query(expense_app.Income).count())
+    headers = {user: {'Authorization': f'Bearer {expense_app.token_signer.issue(user)[0]}'} for user in users}
+
+    server = None
+    if args.url:
+        target = args.url
+        make_transport = lambda: HttpTransport(args.url)  # noqa: E731
+    elif args.target == 'gunicorn':
+        env = dict(os.environ)
+        server, base_url = start_gunicorn(args.workers, args.threads, env)
+        target = f'gunicorn ({args.workers} workers x {args.threads} threads)'
+        make_transport = lambda: HttpTransport(base_url)  # noqa: E731
+    else:
+        target = 'flask test client'
+        make_transport = lambda: ClientTransport(expense_app.app)  # noqa: E731
+
+    results = {}
+    try:
+        for name in names:
+            requests = args.pdf_requests if name == 'pdf' else args.requests
+            results[name] = run_scenario(scenarios[name], make_transport, users, headers,
+                                         requests, min(args.warmup, requests), args.concurrency)
+            log(f'{name:<28} {results[name]["throughput_rps"]:>8.1f} req/s  '
+                f'p50 {results[name]["latency_ms"]["p50"]:.1f} ms  p99 {results[name]["latency_ms"]["p99"]:.1f} ms'
+                + (f'  {results[name]["errors"]} errors' if results[name]['errors'] else ''))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        'meta': {
+            **git_revision(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'target': target,
+            'concurrency': args.concurrency,
+            'warmup': args.warmup,
+            'cold_charts': args.cold_charts,
+            'dataset': {'users': len(users), 'transactions': transactions, 'seed': args.seed,
+                        'generated': generated},
+        },
+        'scenarios': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Concurrency stress check for chart_render.
+
+Renders every chart type from many threads at once and verifies that each
+image is byte-identical to a reference rendered serially, i.e. pooled figures
+are reset correctly and threads do not interfere with each other. Exits with
+status 1 on any mismatch.
+
+    python benchmarks/stress_chart_render.py [threads] [renders_per_thread]
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import common  # noqa: F401  (puts the project root on sys.path)
+from chart_render import CHARTS, render_chart
+
+MONTHS = ['2025-01', '2025-02', '2025-03', '2025-04', '2025-05', '2025-06']
+SERIES = {
+    'expense-categories': {'labels': ['Food', 'Rent', 'Travel', 'Other'], 'values': [250.0, 2400.0, 500.0, 80.5]},
+    'income-sources': {'labels': ['Salary', 'Freelance Work', 'Bonus'], 'values': [5500.0, 1200.0, 300.0]},
+    'income-by-month': {'labels': MONTHS, 'values': [5000.0, 5200.0, 5100.0, 6000.0, 5800.0, 6100.0]},
+    'expense-trends': {'labels': MONTHS, 'values': [3100.0, 2900.5, 3500.0, 2700.0, 3300.0, 3050.25]},
+    'daily-expenses': {'labels': ['2025-06-0%d' % day for day in range(1, 8)],
+                       'values': [12.5, 80.0, 45.0, 0.99, 230.0, 64.0, 18.0]},
+    'income-vs-expenses': {'labels': MONTHS, 'income': [5000.0, 5200.0, 5100.0, 6000.0, 5800.0, 6100.0],
+                           'expenses': [3100.0, 2900.5, 3500.0, 2700.0, 3300.0, 3050.25]},
+}
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+
+    formats = ('png', 'svg')
+    expected = {(chart, fmt): render_chart(chart, SERIES[chart], fmt) for chart in CHARTS for fmt in formats}
+    jobs = list(expected)
+
+    def worker(index):
+        mismatches = 0
+        for i in range(per_thread):
+            chart, fmt = jobs[(index + i) % len(jobs)]
+            if render_chart(chart, SERIES[chart], fmt) != expected[(chart, fmt)]:
+                mismatches += 1
+        return mismatches
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        mismatches = sum(pool.map(worker, range(threads)))
+    elapsed = time.perf_counter() - start
+
+    total = threads * per_thread
+    print(f'{total} renders on {threads} threads in {elapsed:.2f}s '
+          f'({total / elapsed:.1f} charts/s), {mismatches} mismatches')
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
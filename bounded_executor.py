@@ -0,0 +1,86 @@
+"""A thread or process pool with a bounded number of jobs in flight.
+
+Password hashing and rendering are CPU-heavy, so both run on a small pool of
+workers instead of in the request thread. A burst of requests must not pile
+up behind them, so run() takes one of max_pending slots for each job and
+fails immediately with ExecutorBusy when they are all taken, rather than
+queueing without limit. The slot is released when the job really finishes,
+even if the caller stopped waiting for it.
+
+The pool is created on first use, so importing the app never starts threads
+or forks. If a worker process dies the pool is broken for good: the job
+raises BrokenExecutor and the next one starts a new pool. With workers=0
+jobs run inline in the calling thread and only the in-flight limit applies.
+"""
+import threading
+from concurrent.futures import BrokenExecutor, TimeoutError
+
+
+class ExecutorBusy(Exception):
+    pass
+
+
+class BoundedExecutor:
+    def __init__(self, executor_factory, workers, max_pending):
+        """executor_factory(workers) creates the pool, e.g. ThreadPoolExecutor."""
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor_factory = executor_factory
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._executor_factory(self.workers)
+            return self._executor
+
+    def _discard_executor(self, executor):
+        # Another thread may already have replaced the broken pool
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, fn, *args, timeout=None):
+        """Run fn(*args) on a worker and return its result.
+
+        Raises ExecutorBusy when max_pending jobs are in flight, TimeoutError
+        when the result takes longer than timeout seconds, and BrokenExecutor
+        when the pool died.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ExecutorBusy(f'{self.max_pending} jobs already in flight')
+
+        if not self.workers:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenExecutor:
+            self._slots.release()
+            self._discard_executor(executor)
+            raise
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+        except BrokenExecutor:
+            self._discard_executor(executor)
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,174 @@
+"""Thread-safe chart rendering.
+
+Charts are drawn with the object-oriented matplotlib API (Figure plus an Agg
+canvas) instead of pyplot, so no global figure state is shared between
+requests and several threads can render at once. Figures are expensive to
+create, so each chart type keeps a small pool of cleared figures for reuse.
+
+Every renderer takes the same series payload that /api/chart-data returns:
+{'labels': [...], 'values': [...]}, or {'labels', 'income', 'expenses'} for
+the income-vs-expenses chart.
+"""
+import io
+import threading
+
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+SUBPLOT_PARAMS = ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
+
+# A fixed salt makes SVG element ids (and so the output bytes) deterministic
+matplotlib.rcParams['svg.hashsalt'] = 'expense-tracker'
+
+
+class FigurePool:
+    """Per chart type pool of reusable figures."""
+
+    def __init__(self, max_idle=4):
+        self.max_idle = max_idle
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, chart_type, figsize):
+        with self._lock:
+            idle = self._idle.get(chart_type)
+            if idle:
+                return idle.pop()
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        return fig
+
+    def release(self, chart_type, fig):
+        # Reset everything a renderer may have changed so the next user of
+        # this figure gets the same output as from a fresh one.
+        fig.clf()
+        fig.subplots_adjust(**{name: matplotlib.rcParams[f'figure.subplot.{name}'] for name in SUBPLOT_PARAMS})
+        with self._lock:
+            idle = self._idle.setdefault(chart_type, [])
+            if len(idle) < self.max_idle:
+                idle.append(fig)
+
+
+figure_pool = FigurePool()
+
+
+def draw_pie(fig, series, title, colors):
+    ax = fig.add_subplot()
+    ax.pie(series['values'], labels=series['labels'], autopct='%1.1f%%',
+           colors=colors[:len(series['labels'])], startangle=90)
+    ax.set_title(title, fontsize=16, pad=20)
+    ax.axis('equal')
+
+
+def draw_expense_categories(fig, series):
+    draw_pie(fig, series, 'Expenses by Category',
+             ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8', '#F7DC6F', '#BB8FCE', '#85C1E9'])
+
+
+def draw_income_sources(fig, series):
+    draw_pie(fig, series, 'Income by Source',
+             ['#4cc9f0', '#4361ee', '#3a0ca3', '#7209b7', '#f72585', '#4895ef', '#4cc9f0', '#f8961e', '#90be6d', '#f9c74f'])
+
+
+def draw_labelled_bars(fig, series, color, xlabel, ylabel, title):
+    labels, amounts = series['labels'], series['values']
+    ax = fig.add_subplot()
+    bars = ax.bar(range(len(labels)), amounts, color=color)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.set_xticks(range(len(labels)), labels, rotation=45)
+
+    # Add value labels on bars
+    for bar, amount in zip(bars, amounts):
+        ax.text(bar.get_x() + bar.get_width() / 2., bar.get_height(),
+                f'${amount:.2f}',
+                ha='center', va='bottom')
+
+    fig.tight_layout()
+
+
+def draw_income_by_month(fig, series):
+    draw_labelled_bars(fig, series, '#4cc9f0', 'Month', 'Income ($)', 'Monthly Income')
+
+
+def draw_daily_expenses(fig, series):
+    draw_labelled_bars(fig, series, '#f72585', 'Date', 'Expenses ($)', 'Daily Expenses (Last 7 Days)')
+
+
+def draw_expense_trends(fig, series):
+    months, amounts = series['labels'], series['values']
+    ax = fig.add_subplot()
+    ax.plot(range(len(months)), amounts, marker='o', linewidth=2, markersize=8, color='#f72585')
+    ax.fill_between(range(len(months)), amounts, alpha=0.3, color='#f72585')
+    ax.set_xlabel('Month')
+    ax.set_ylabel('Expenses ($)')
+    ax.set_title('Monthly Expense Trends')
+    ax.set_xticks(range(len(months)), months, rotation=45)
+    ax.grid(True, alpha=0.3)
+
+    # Add value labels on points
+    for i, amount in enumerate(amounts):
+        ax.annotate(f'${amount:.2f}',
+                    (i, amount),
+                    textcoords="offset points",
+                    xytext=(0, 10),
+                    ha='center')
+
+    fig.tight_layout()
+
+
+def draw_income_vs_expenses(fig, series):
+    months = series['labels']
+    income_amounts, expense_amounts = series['income'], series['expenses']
+    x = np.arange(len(months))
+    width = 0.35
+
+    ax = fig.add_subplot()
+    ax.bar(x - width / 2, income_amounts, width, label='Income', color='#4cc9f0')
+    ax.bar(x + width / 2, expense_amounts, width, label='Expenses', color='#f72585')
+    ax.set_xlabel('Month')
+    ax.set_ylabel('Amount ($)')
+    ax.set_title('Monthly Income vs Expenses')
+    ax.set_xticks(x, months, rotation=45)
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+    # Add value labels on bars
+    for i, (income, expense) in enumerate(zip(income_amounts, expense_amounts)):
+        ax.text(i - width / 2, income + max(income, expense) * 0.01,
+                f'${income:.2f}',
+                ha='center', va='bottom', fontsize=8)
+        ax.text(i + width / 2, expense + max(income, expense) * 0.01,
+                f'${expense:.2f}',
+                ha='center', va='bottom', fontsize=8)
+
+    fig.tight_layout()
+
+
+# chart type -> (figure size, draw function)
+CHARTS = {
+    'expense-categories': ((10, 8), draw_expense_categories),
+    'income-sources': ((10, 8), draw_income_sources),
+    'income-by-month': ((12, 6), draw_income_by_month),
+    'expense-trends': ((12, 6), draw_expense_trends),
+    'daily-expenses': ((12, 6), draw_daily_expenses),
+    'income-vs-expenses': ((12, 6), draw_income_vs_expenses),
+}
+
+
+def render_chart(chart_type, series, chart_format='png'):
+    """Render a chart and return the encoded image bytes."""
+    figsize, draw = CHARTS[chart_type]
+    fig = figure_pool.acquire(chart_type, figsize)
+    try:
+        draw(fig, series)
+        img_buffer = io.BytesIO()
+        # Drop the SVG timestamp so identical data always gives identical bytes
+        metadata = {'Date': None} if chart_format == 'svg' else None
+        fig.savefig(img_buffer, format=chart_format, bbox_inches='tight', metadata=metadata)
+        return img_buffer.getvalue()
+    finally:
+        figure_pool.release(chart_type, fig)
@@ -0,0 +1,222 @@
+"""Database engine configuration.
+
+The app runs on SQLite (the default) or PostgreSQL, chosen by DATABASE_URL.
+Queries stay portable by building dialect-specific SQL only here: the
+month_bucket() and day_bucket() expressions used by the monthly and daily
+aggregations, epoch_day() for the analytics, upsert_insert() for
+INSERT ... ON CONFLICT and text_search() for full-text search.
+
+SQLite's defaults (rollback journal, full fsync on every commit, a 2 MB page
+cache) make writers block readers, so several gunicorn workers sharing one
+database file see "database is locked" errors and slow commits. The
+"performance" profile switches the database to WAL, where readers never block
+the writer, and tunes the per-connection pragmas. The pragmas are applied
+from a connect event, so every pooled connection gets them.
+
+The profile is chosen with DB_PROFILE ("performance", the default, or
+"default" for SQLite's own settings). Pool sizing comes from DB_POOL_SIZE,
+DB_MAX_OVERFLOW, DB_POOL_TIMEOUT and, for server databases, DB_POOL_RECYCLE.
+"""
+import os
+import re
+
+from sqlalchemy import Integer, String, and_, cast, column, event, func, literal_column, table
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+SQLITE_PROFILES = {
+    'default': {},
+    'performance': {
+        # Readers keep working while a write is in progress
+        'journal_mode': 'WAL',
+        # In WAL mode this only fsyncs at checkpoints; a power loss can drop
+        # the last commits but never corrupts the database
+        'synchronous': 'NORMAL',
+        # Wait for a competing writer instead of failing immediately (ms)
+        'busy_timeout': 5000,
+        'mmap_size': 256 * 1024 * 1024,
+        # Negative values are in KiB: 64 MB page cache per connection
+        'cache_size': -64 * 1024,
+        'temp_store': 'MEMORY',
+    },
+}
+
+
+def get_profile():
+    profile = os.environ.get('DB_PROFILE', 'performance')
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f'Unknown DB_PROFILE {profile!r}, expected one of {", ".join(SQLITE_PROFILES)}')
+    return profile
+
+
+def normalize_database_url(database_url):
+    """Use the psycopg (3) driver for postgres:// and postgresql:// URLs.
+
+    Hosting providers often hand out the older postgres:// scheme, and the
+    default driver for postgresql:// differs between SQLAlchemy versions.
+    """
+    for scheme in ('postgres://', 'postgresql://'):
+        if database_url.startswith(scheme):
+            return 'postgresql+psycopg://' + database_url[len(scheme):]
+    return database_url
+
+
+def engine_options(database_url):
+    """Keyword arguments for create_engine (SQLALCHEMY_ENGINE_OPTIONS)."""
+    url = make_url(database_url)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # In-memory databases use a single shared connection, not a sized pool
+        return {}
+    options = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_pre_ping': True,
+    }
+    if url.get_backend_name() != 'sqlite':
+        # Replace server connections before proxies or the server drop them
+        options['pool_recycle'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    return options
+
+
+def configure_engine(engine, profile=None):
+    """Apply the profile's pragmas to every new connection of a SQLite engine."""
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = SQLITE_PROFILES[profile or get_profile()]
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
+
+
+def upsert_insert(dialect_name, table):
+    """An INSERT for table that supports on_conflict_do_update()."""
+    # Imported here so SQLite deployments never load the PostgreSQL dialect
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def search_words(query):
+    """The words of a search query; punctuation and FTS/tsquery syntax are dropped."""
+    return re.findall(r'[^\W_]+', query)
+
+
+def search_document(columns):
+    """The searched text of a row: its columns joined with spaces.
+
+    On PostgreSQL this must stay identical to the indexed expression created
+    by migration 5, or the GIN index is not used.
+    """
+    document = columns[0]
+    for col in columns[1:]:
+        document = document.op('||')(literal_column("' '")).op('||')(col)
+    return document
+
+
+def text_search(dialect_name, source, columns, words, user_id):
+    """Prefix search for the user's rows of source containing every word in columns.
+
+    Returns (from clause, condition, rank, row id) where a lower rank is a
+    better match. Ordering by the returned row id lets the index stream
+    matches newest first without ranking them all. SQLite uses the
+    <table>_search FTS5 index, which also indexes user_id so that only the
+    user's rows are matched; PostgreSQL uses the GIN index on
+    to_tsvector('simple', ...) and ts_rank.
+    """
+    if dialect_name == 'postgresql':
+        vector = func.to_tsvector(literal_column("'simple'"), search_document(columns))
+        query = func.to_tsquery(literal_column("'simple'"), ' & '.join(f'{word}:*' for word in words))
+        condition = and_(vector.op('@@')(query), source.c.user_id == user_id)
+        return source, condition, -func.ts_rank(vector, query), source.c.id
+    index = table(f'{source.name}_search', column('rowid'))
+    names = ' '.join(col.name for col in columns)
+    phrases = ' '.join(f'"{word}"*' for word in words)
+    match = f'user_id : "{int(user_id)}" AND {{{names}}} : ({phrases})'
+    condition = literal_column(index.name).op('MATCH')(match)
+    # Like ts_rank, rank by how often the words occur in the row. bm25() would
+    # also weigh each word by its rarity, which means reading every row of the
+    # user_id term's index on each query, however few rows are ranked.
+    rank = -sum(marked_count(index.name, position) for position in range(len(columns)))
+    return source.join(index, index.c.rowid == source.c.id), condition, rank, index.c.rowid
+
+
+def marked_count(index_name, position):
+    """Occurrences of the matched words in one column of an FTS5 match."""
+    marked = func.highlight(literal_column(index_name), position, func.char(1), '')
+    return func.length(marked) - func.length(func.replace(marked, func.char(1), ''))
+
+
+class month_bucket(FunctionElement):
+    """The 'YYYY-MM' month of a timestamp column, as text."""
+    type = String()
+    name = 'month_bucket'
+    inherit_cache = True
+
+
+class day_bucket(FunctionElement):
+    """The 'YYYY-MM-DD' day of a timestamp column, as text."""
+    type = String()
+    name = 'day_bucket'
+    inherit_cache = True
+
+
+class epoch_day(FunctionElement):
+    """Whole days from 1970-01-01 to the date of a timestamp column, as an integer."""
+    type = Integer()
+    name = 'epoch_day'
+    inherit_cache = True
+
+
+# The formats are inlined rather than bound so that the same expression in
+# SELECT and GROUP BY compiles to identical SQL on every backend.
+@compiles(month_bucket)
+def compile_month_bucket(element, compiler, **kw):
+    return compiler.process(sqlite_strftime('%Y-%m', element), **kw)
+
+
+@compiles(month_bucket, 'postgresql')
+def compile_month_bucket_postgresql(element, compiler, **kw):
+    return compiler.process(postgres_to_char('YYYY-MM', element), **kw)
+
+
+@compiles(day_bucket)
+def compile_day_bucket(element, compiler, **kw):
+    return compiler.process(sqlite_strftime('%Y-%m-%d', element), **kw)
+
+
+@compiles(day_bucket, 'postgresql')
+def compile_day_bucket_postgresql(element, compiler, **kw):
+    return compiler.process(postgres_to_char('YYYY-MM-DD', element), **kw)
+
+
+@compiles(epoch_day)
+def compile_epoch_day(element, compiler, **kw):
+    # julianday() of the midnight of that date; 2440587.5 is 1970-01-01
+    day = func.julianday(func.date(*element.clauses.clauses)) - literal_column('2440587.5')
+    return compiler.process(cast(day, Integer), **kw)
+
+
+@compiles(epoch_day, 'postgresql')
+def compile_epoch_day_postgresql(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    return f"(CAST({column} AS DATE) - DATE '1970-01-01')"
+
+
+def sqlite_strftime(fmt, element):
+    return func.strftime(literal_column(f"'{fmt}'"), *element.clauses.clauses)
+
+
+def postgres_to_char(fmt, element):
+    return func.to_char(*element.clauses.clauses, literal_column(f"'{fmt}'"))
@@ -0,0 +1,174 @@
+"""Per-request performance metrics in the Prometheus text format.
+
+RequestMetrics hooks into a Flask app and a SQLAlchemy engine and records,
+per endpoint: request latency, response size, and the number and total time
+of the SQL queries the request ran. Render jobs (charts, PDF reports) are
+timed separately with time_render(). Everything is exposed by render() in
+the Prometheus text exposition format for the /metrics route.
+
+Metrics live in process memory, so under gunicorn each worker reports its
+own counts; Prometheus sums them when it scrapes every worker, or the
+numbers can be read per worker.
+
+When slow_request_ms is set, requests slower than that are logged with the
+statements they executed and how long each took.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+# Longest SQL statement kept for the slow-request log
+MAX_LOGGED_STATEMENT = 500
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}  # label values -> float
+
+    def inc(self, labels=(), amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        for labels, value in sorted(self._values.items()):
+            lines.append(f'{self.name}{format_labels(self.labelnames, labels)} {value:g}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}  # label values -> [per-bucket counts..., +Inf count, sum]
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        names = self.labelnames + ('le',)
+        bounds = [f'{bound:g}' for bound in self.buckets] + ['+Inf']
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{format_labels(names, labels + (bound,))} {cumulative}')
+            lines.append(f'{self.name}_sum{format_labels(self.labelnames, labels)} {series[-1]:g}')
+            lines.append(f'{self.name}_count{format_labels(self.labelnames, labels)} {cumulative}')
+        return lines
+
+
+class RequestMetrics:
+    def __init__(self, slow_request_ms=None, logger=None):
+        self.slow_request_ms = slow_request_ms
+        self.logger = logger
+        self._lock = threading.Lock()
+        self.requests = Counter('http_requests_total', 'Requests handled.', ('endpoint', 'method', 'status'))
+        self.latency = Histogram('http_request_duration_seconds', 'Time to build the response.',
+                                 ('endpoint', 'method'))
+        self.response_size = Histogram('http_response_size_bytes', 'Response body size (streams of unknown length excluded).',
+                                       ('endpoint',), SIZE_BUCKETS)
+        self.queries = Histogram('db_queries_per_request', 'SQL statements executed per request.',
+                                 ('endpoint',), QUERY_COUNT_BUCKETS)
+        self.query_time = Histogram('db_query_duration_seconds', 'Total SQL time per request.', ('endpoint',))
+        self.render_time = Histogram('render_duration_seconds', 'Chart and PDF render time.', ('kind',))
+        self._metrics = [self.requests, self.latency, self.response_size, self.queries, self.query_time,
+                         self.render_time]
+
+    def init_app(self, app):
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    def instrument_engine(self, engine):
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _start_request(self):
+        g.metrics_start = time.perf_counter()
+        g.metrics_query_count = 0
+        g.metrics_query_seconds = 0.0
+        # Statements are only kept when they may be logged
+        g.metrics_statements = [] if self.slow_request_ms else None
+
+    # The start time lives on the statement's execution context, which is
+    # discarded with the statement, so one that raises leaves nothing behind
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and context is not None:
+            context._metrics_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not has_request_context() or 'metrics_start' not in g:
+            return
+        start = getattr(context, '_metrics_start', None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        g.metrics_query_count += 1
+        g.metrics_query_seconds += elapsed
+        if g.metrics_statements is not None:
+            g.metrics_statements.append((elapsed, statement))
+
+    def _finish_request(self, response):
+        if 'metrics_start' not in g:
+            return response
+        elapsed = time.perf_counter() - g.metrics_start
+        endpoint = request.endpoint or 'unmatched'
+        size = response.content_length if response.is_streamed else response.calculate_content_length()
+        with self._lock:
+            self.requests.inc((endpoint, request.method, str(response.status_code)))
+            self.latency.observe((endpoint, request.method), elapsed)
+            if size is not None:
+                self.response_size.observe((endpoint,), size)
+            self.queries.observe((endpoint,), g.metrics_query_count)
+            self.query_time.observe((endpoint,), g.metrics_query_seconds)
+
+        if self.slow_request_ms and elapsed * 1000 >= self.slow_request_ms and self.logger:
+            lines = [f'Slow request: {request.method} {request.full_path.rstrip("?")} -> {response.status_code} '
+                     f'in {elapsed * 1000:.1f} ms, {g.metrics_query_count} queries '
+                     f'({g.metrics_query_seconds * 1000:.1f} ms)']
+            for seconds, statement in g.metrics_statements:
+                statement = ' '.join(statement.split())
+                if len(statement) > MAX_LOGGED_STATEMENT:
+                    statement = statement[:MAX_LOGGED_STATEMENT] + '...'
+                lines.append(f'  {seconds * 1000:8.2f} ms  {statement}')
+            self.logger.warning('\n'.join(lines))
+        return response
+
+    @contextmanager
+    def time_render(self, kind):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.render_time.observe((kind,), time.perf_counter() - start)
+
+    def render(self):
+        with self._lock:
+            lines = []
+            for metric in self._metrics:
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,271 @@
+"""Versioned schema migrations.
+
+db.create_all() only creates missing tables; it never alters tables that
+already exist. Every change to an existing table is therefore registered here
+as a numbered migration and applied once, in order, at application startup.
+The applied version is recorded in the schema_version table.
+
+Because create_all() runs first, a fresh database already has the current
+schema; migrations must be idempotent (IF NOT EXISTS, has_column checks).
+
+Every gunicorn worker imports the app and so runs upgrade() at the same
+time. upgrade() therefore does all of its work (create_all, the version
+check and the migrations) in one transaction that holds an exclusive lock:
+BEGIN EXCLUSIVE on SQLite, a transaction-level advisory lock on PostgreSQL.
+The first worker migrates; the others wait, then find nothing left to do.
+
+Migrations use plain SQL rather than the models in app.py, so they keep
+working as the models evolve. SQL that differs between SQLite and PostgreSQL
+goes through a helper such as month_sql().
+"""
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+
+MIGRATIONS = []
+# Seconds a worker waits for another worker's upgrade before giving up
+LOCK_TIMEOUT = 600
+# Key of the PostgreSQL advisory lock that serialises upgrades
+ADVISORY_LOCK_KEY = 5113708
+
+
+def migration(version, description):
+    """Register a migration function under the given version number."""
+    def decorator(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return fn
+    return decorator
+
+
+def has_column(conn, table, column):
+    """True if the column already exists, e.g. because create_all() made the table."""
+    return any(col['name'] == column for col in inspect(conn).get_columns(table))
+
+
+def month_sql(conn, column):
+    """SQL for the 'YYYY-MM' month of a timestamp column on this backend."""
+    if conn.dialect.name == 'postgresql':
+        return f"to_char({column}, 'YYYY-MM')"
+    return f"strftime('%Y-%m', {column})"
+
+
+def get_version(conn):
+    conn.execute(text('CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)'))
+    return conn.execute(text('SELECT MAX(version) FROM schema_version')).scalar() or 0
+
+
+@contextmanager
+def schema_lock(engine):
+    """A connection in a transaction that no other upgrade can run alongside."""
+    if engine.dialect.name == 'postgresql':
+        with engine.begin() as conn:
+            conn.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': ADVISORY_LOCK_KEY})
+            yield conn
+        return
+
+    # pysqlite would start a deferred transaction itself; take over so that
+    # the lock is held from the first read of the schema
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level='AUTOCOMMIT')
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                conn.exec_driver_sql('BEGIN EXCLUSIVE')
+                break
+            except OperationalError as e:
+                if 'locked' not in str(e.orig) or time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+        try:
+            yield conn
+        except BaseException:
+            conn.exec_driver_sql('ROLLBACK')
+            raise
+        conn.exec_driver_sql('COMMIT')
+
+
+def upgrade(engine, metadata=None):
+    """Create missing tables, then apply every migration newer than the database.
+
+    Everything runs in one transaction under schema_lock(), so concurrent
+    workers upgrade one at a time and a failed migration leaves the database
+    as it was. Returns the list of versions that were applied.
+    """
+    applied = []
+    with schema_lock(engine) as conn:
+        if metadata is not None:
+            metadata.create_all(conn)
+        current = get_version(conn)
+        for version, description, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            migrate(conn)
+            conn.execute(text('INSERT INTO schema_version (version) VALUES (:version)'), {'version': version})
+            applied.append(version)
+    return applied
+
+
+@migration(1, 'composite indexes for per-user date and category access')
+def add_user_indexes(conn):
+    # Tables created with integer cents already have these indexes (on amount_cents)
+    if not has_column(conn, 'expense', 'amount'):
+        return
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_expense_user_date ON expense (user_id, date, amount)'))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_expense_user_category ON expense (user_id, category, amount)'))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_income_user_date ON income (user_id, date, amount)'))
+
+
+@migration(2, 'per-user data version used to key cached charts')
+def add_user_data_version(conn):
+    if not has_column(conn, 'user', 'data_version'):
+        conn.execute(text('ALTER TABLE "user" ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0'))
+
+
+@migration(3, 'backfill the monthly rollup table')
+def backfill_monthly_rollup(conn):
+    # create_all() made the (empty) table; fill it from the existing ledger.
+    # A table created with integer cents is filled by migration 4 instead.
+    if not has_column(conn, 'monthly_rollup', 'total'):
+        return
+    if conn.execute(text('SELECT COUNT(*) FROM monthly_rollup')).scalar():
+        return
+    month = month_sql(conn, 'date')
+    conn.execute(text(
+        "INSERT INTO monthly_rollup (user_id, kind, month, category, total, entries) "
+        f"SELECT user_id, 'expense', {month}, category, SUM(amount), COUNT(*) "
+        f"FROM expense GROUP BY user_id, {month}, category"
+    ))
+    conn.execute(text(
+        "INSERT INTO monthly_rollup (user_id, kind, month, category, total, entries) "
+        f"SELECT user_id, 'income', {month}, COALESCE(NULLIF(description, ''), 'Unspecified'), "
+        "SUM(amount), COUNT(*) "
+        f"FROM income GROUP BY user_id, {month}, COALESCE(NULLIF(description, ''), 'Unspecified')"
+    ))
+
+
+# Indexes that include the amount column, per table
+AMOUNT_INDEXES = {
+    'expense': [('ix_expense_user_date', 'user_id, date'), ('ix_expense_user_category', 'user_id, category')],
+    'income': [('ix_income_user_date', 'user_id, date')],
+}
+
+
+@migration(4, 'store amounts as integer cents')
+def store_amounts_as_cents(conn):
+    for table, indexes in AMOUNT_INDEXES.items():
+        if not has_column(conn, table, 'amount'):
+            continue
+        if not has_column(conn, table, 'amount_cents'):
+            conn.execute(text(f'ALTER TABLE {table} ADD COLUMN amount_cents BIGINT NOT NULL DEFAULT 0'))
+        conn.execute(text(f'UPDATE {table} SET amount_cents = CAST(ROUND(amount * 100) AS BIGINT)'))
+        # SQLite cannot drop a column that is still indexed
+        for name, _ in indexes:
+            conn.execute(text(f'DROP INDEX IF EXISTS {name}'))
+        conn.execute(text(f'ALTER TABLE {table} DROP COLUMN amount'))
+        for name, columns in indexes:
+            conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns}, amount_cents)'))
+
+    # The rollup is derived data: recreate a float one and refill it
+    if has_column(conn, 'monthly_rollup', 'total'):
+        conn.execute(text('DROP TABLE monthly_rollup'))
+        conn.execute(text(
+            'CREATE TABLE monthly_rollup ('
+            'user_id INTEGER NOT NULL REFERENCES "user" (id), '
+            'kind VARCHAR(10) NOT NULL, '
+            'month VARCHAR(7) NOT NULL, '
+            'category VARCHAR(200) NOT NULL, '
+            'total_cents BIGINT NOT NULL, '
+            'entries INTEGER NOT NULL, '
+            'PRIMARY KEY (user_id, kind, month, category))'
+        ))
+    if conn.execute(text('SELECT COUNT(*) FROM monthly_rollup')).scalar():
+        return
+    month = month_sql(conn, 'date')
+    conn.execute(text(
+        "INSERT INTO monthly_rollup (user_id, kind, month, category, total_cents, entries) "
+        f"SELECT user_id, 'expense', {month}, category, SUM(amount_cents), COUNT(*) "
+        f"FROM expense GROUP BY user_id, {month}, category"
+    ))
+    conn.execute(text(
+        "INSERT INTO monthly_rollup (user_id, kind, month, category, total_cents, entries) "
+        f"SELECT user_id, 'income', {month}, COALESCE(NULLIF(description, ''), 'Unspecified'), "
+        "SUM(amount_cents), COUNT(*) "
+        f"FROM income GROUP BY user_id, {month}, COALESCE(NULLIF(description, ''), 'Unspecified')"
+    ))
+
+
+# Full-text search documents per table: the searchable columns
+SEARCH_COLUMNS = {'expense': ('description', 'category'), 'income': ('description',)}
+# Also indexed (but not searched) by the SQLite search tables, see migration 6
+SEARCH_OWNER_COLUMN = 'user_id'
+
+
+@migration(5, 'full-text search over descriptions and categories')
+def add_full_text_search(conn):
+    if conn.dialect.name == 'postgresql':
+        # Expression GIN indexes; PostgreSQL keeps them current on every write.
+        # The expressions must match db_config.search_document() exactly.
+        for table, columns in SEARCH_COLUMNS.items():
+            document = " || ' ' || ".join(columns)
+            conn.execute(text(
+                f'CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} '
+                f"USING GIN (to_tsvector('simple', {document}))"
+            ))
+        return
+
+    if not has_fts5(conn):
+        return
+    for table, columns in SEARCH_COLUMNS.items():
+        create_sqlite_search_index(conn, table, columns)
+
+
+def has_fts5(conn):
+    return conn.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar()
+
+
+def create_sqlite_search_index(conn, table, columns):
+    """An FTS5 index <table>_search over columns, filled from the table."""
+    names = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    # External-content FTS5 table: the index refers to the table's rows by
+    # id instead of storing a second copy of the text. prefix= adds
+    # indexes for 2- and 3-character prefixes so prefix queries stay fast.
+    conn.execute(text(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {table}_search USING fts5('
+        f"{names}, content='{table}', content_rowid='id', "
+        "prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+    ))
+    # Triggers keep the index in step with every write path, including
+    # bulk imports and batch updates
+    conn.execute(text(
+        f'CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN '
+        f'INSERT INTO {table}_search (rowid, {names}) VALUES (new.id, {new_values}); END'
+    ))
+    conn.execute(text(
+        f'CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN '
+        f"INSERT INTO {table}_search ({table}_search, rowid, {names}) VALUES ('delete', old.id, {old_values}); END"
+    ))
+    conn.execute(text(
+        f'CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {names} ON {table} BEGIN '
+        f"INSERT INTO {table}_search ({table}_search, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f'INSERT INTO {table}_search (rowid, {names}) VALUES (new.id, {new_values}); END'
+    ))
+    conn.execute(text(f"INSERT INTO {table}_search ({table}_search) VALUES ('rebuild')"))
+
+
+@migration(6, 'index the owner in the SQLite search tables')
+def add_search_owner(conn):
+    # With user_id as an indexed column, a query matches only the searching
+    # user's rows inside FTS5 instead of every user's matches being joined
+    # and filtered. PostgreSQL keeps filtering by user_id in SQL.
+    if conn.dialect.name == 'postgresql' or not has_fts5(conn):
+        return
+    for table, columns in SEARCH_COLUMNS.items():
+        for trigger in ('insert', 'delete', 'update'):
+            conn.execute(text(f'DROP TRIGGER IF EXISTS {table}_search_{trigger}'))
+        conn.execute(text(f'DROP TABLE IF EXISTS {table}_search'))
+        create_sqlite_search_index(conn, table, columns + (SEARCH_OWNER_COLUMN,))
@@ -0,0 +1,124 @@
+"""Password hashing with a versioned, tunable format.
+
+Stored hashes name their algorithm and cost so that the settings can change
+without invalidating existing accounts:
+
+    scrypt$<n>$<r>$<p>$<salt>$<hash>
+    pbkdf2_sha256$<iterations>$<salt>$<hash>
+
+(salt and hash are unpadded urlsafe base64). Hashes from before this format
+are a bare hex SHA-256 of the password. They still verify, and
+needs_rehash() reports them (and hashes made with older cost settings) so
+the login route can replace them while it has the plain password.
+
+A slow KDF is CPU-heavy by design, so a burst of logins could occupy every
+worker thread. Hashing therefore runs on a bounded_executor.BoundedExecutor
+thread pool: hashlib's scrypt and pbkdf2_hmac release the GIL, so other
+requests keep being served while it works. When the pool is saturated,
+hash() and verify() fail immediately with HasherBusy and the caller answers
+503. With threads=0 hashing runs inline in the calling thread.
+"""
+import base64
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from bounded_executor import BoundedExecutor, ExecutorBusy
+
+SCHEMES = ('scrypt', 'pbkdf2_sha256')
+
+
+class HasherBusy(Exception):
+    pass
+
+
+def b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def scrypt(password, salt, n, r, p):
+    # maxmem must cover the 128 * n * r bytes scrypt needs, plus some headroom
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r * p + 1024 * 1024, dklen=32)
+
+
+def pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+
+
+def legacy_sha256(password):
+    """The pre-versioning format: an unsalted hex SHA-256."""
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+class PasswordHasher:
+    def __init__(self, scheme='scrypt', scrypt_n=2 ** 14, scrypt_r=8, scrypt_p=1,
+                 pbkdf2_iterations=600000, threads=2, max_pending=16):
+        if scheme not in SCHEMES:
+            raise ValueError(f'Unknown password scheme {scheme!r}, expected one of {", ".join(SCHEMES)}')
+        self.scheme = scheme
+        self.scrypt_params = (scrypt_n, scrypt_r, scrypt_p)
+        self.pbkdf2_iterations = pbkdf2_iterations
+        self.threads = threads
+        self.max_pending = max_pending
+        self._executor = BoundedExecutor(partial(ThreadPoolExecutor, thread_name_prefix='password-hash'),
+                                         threads, max_pending)
+        self._dummy_hash = None
+
+    def _run(self, fn, *args):
+        try:
+            return self._executor.run(fn, *args)
+        except ExecutorBusy:
+            raise HasherBusy('Too many logins in progress, try again shortly') from None
+
+    def _hash(self, password):
+        salt = os.urandom(16)
+        if self.scheme == 'scrypt':
+            n, r, p = self.scrypt_params
+            return f'scrypt${n}${r}${p}${b64encode(salt)}${b64encode(scrypt(password, salt, n, r, p))}'
+        iterations = self.pbkdf2_iterations
+        return f'pbkdf2_sha256${iterations}${b64encode(salt)}${b64encode(pbkdf2(password, salt, iterations))}'
+
+    def _verify(self, password, stored):
+        parts = stored.split('$')
+        try:
+            if parts[0] == 'scrypt' and len(parts) == 6:
+                n, r, p = (int(value) for value in parts[1:4])
+                expected, actual = b64decode(parts[5]), scrypt(password, b64decode(parts[4]), n, r, p)
+            elif parts[0] == 'pbkdf2_sha256' and len(parts) == 4:
+                expected, actual = b64decode(parts[3]), pbkdf2(password, b64decode(parts[2]), int(parts[1]))
+            elif len(parts) == 1:
+                expected, actual = stored, legacy_sha256(password)
+            else:
+                return False
+        except ValueError:
+            return False
+        return hmac.compare_digest(expected, actual)
+
+    def hash(self, password):
+        """A new salted hash of password in the configured scheme."""
+        return self._run(self._hash, password)
+
+    def verify(self, password, stored):
+        """True if password matches the stored hash (any supported format)."""
+        return self._run(self._verify, password, stored)
+
+    def verify_dummy(self, password):
+        """Spend the same time as a real check, for logins of unknown users."""
+        if self._dummy_hash is None:
+            self._dummy_hash = self.hash('dummy password')
+        self.verify(password, self._dummy_hash)
+        return False
+
+    def needs_rehash(self, stored):
+        """True if stored is not in the configured scheme with the current cost."""
+        parts = stored.split('$')
+        if self.scheme == 'scrypt':
+            return parts[0] != 'scrypt' or tuple(parts[1:4]) != tuple(str(v) for v in self.scrypt_params)
+        return parts[0] != 'pbkdf2_sha256' or parts[1:2] != [str(self.pbkdf2_iterations)]
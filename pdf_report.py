@@ -0,0 +1,251 @@
+"""PDF report rendering.
+
+The report is written page by page: rows are streamed from the database
+with a server-side cursor in chunks, and each page is drawn as soon as it is
+full. Column headers repeat at the top of every page. The rows are never
+all held in memory, but ReportLab keeps every finished page until save(),
+so memory still grows with the length of the report (roughly 0.4 KB per
+row). The finished PDF goes to a temporary file that the caller streams to
+the client and then deletes.
+
+render_pdf_report() only takes plain values (database URL, user id, date
+range), so it can run in a render_service worker process, which opens its own
+database connection.
+"""
+import os
+import tempfile
+from datetime import timedelta
+from itertools import chain
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, MetaData, String, Table as SqlTable, create_engine, func, select
+
+import db_config
+
+# For PDF generation (optional dependency)
+try:
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+    # reportlab is optional; PDF endpoints will return 501 if unavailable
+
+# Only the columns the report reads; kept separate from the app's models so
+# worker processes do not need to import the Flask app.
+metadata = MetaData()
+expense_table = SqlTable(
+    'expense', metadata,
+    Column('id', Integer), Column('user_id', Integer), Column('amount_cents', BigInteger),
+    Column('description', String), Column('category', String), Column('date', DateTime)
+)
+income_table = SqlTable(
+    'income', metadata,
+    Column('id', Integer), Column('user_id', Integer), Column('amount_cents', BigInteger),
+    Column('description', String), Column('date', DateTime)
+)
+
+FETCH_CHUNK_SIZE = 1000
+MARGIN = 50
+HEADER_ROW_HEIGHT = 24
+ROW_HEIGHT = 18
+MAX_CELL_CHARS = 45
+
+_engines = {}
+
+
+def get_engine(database_url):
+    # One engine per process and database
+    if database_url not in _engines:
+        engine = create_engine(database_url)
+        db_config.configure_engine(engine)
+        _engines[database_url] = engine
+    return _engines[database_url]
+
+
+def truncate(text):
+    text = text or ''
+    return text if len(text) <= MAX_CELL_CHARS else text[:MAX_CELL_CHARS - 3] + '...'
+
+
+class ReportWriter:
+    """Draws headings and multi-page tables onto a canvas, top to bottom."""
+
+    def __init__(self, output):
+        self.canvas = canvas.Canvas(output, pagesize=letter, pageCompression=1)
+        self.width, self.height = letter
+        self.page = 1
+        self.y = self.height - MARGIN
+
+    def new_page(self):
+        self.draw_footer()
+        self.canvas.showPage()
+        self.page += 1
+        self.y = self.height - MARGIN
+
+    def draw_footer(self):
+        self.canvas.setFont("Helvetica", 9)
+        self.canvas.drawRightString(self.width - MARGIN, MARGIN / 2, f"Page {self.page}")
+
+    def text(self, text, font="Helvetica", size=12, indent=0, spacing=20):
+        if self.y - spacing < MARGIN:
+            self.new_page()
+        self.canvas.setFont(font, size)
+        self.canvas.drawString(MARGIN + indent, self.y - size, text)
+        self.y -= spacing
+
+    def heading(self, text):
+        # Keep a heading on the same page as at least a few of its rows
+        if self.y - 30 - HEADER_ROW_HEIGHT - 3 * ROW_HEIGHT < MARGIN:
+            self.new_page()
+        self.text(text, font="Helvetica-Bold", size=16, spacing=30)
+
+    def rows_that_fit(self):
+        return int((self.y - MARGIN - HEADER_ROW_HEIGHT) // ROW_HEIGHT)
+
+    def draw_rows(self, header, rows, col_widths):
+        # Drawn with plain canvas operations rather than a platypus Table:
+        # with thousands of pages this is several times faster and keeps the
+        # per-page content small.
+        c = self.canvas
+        top = self.y
+        height = HEADER_ROW_HEIGHT + ROW_HEIGHT * len(rows)
+        xs = [MARGIN]
+        for col_width in col_widths:
+            xs.append(xs[-1] + col_width)
+        ys = [top, top - HEADER_ROW_HEIGHT] + [top - HEADER_ROW_HEIGHT - ROW_HEIGHT * (i + 1) for i in range(len(rows))]
+
+        c.setFillColor(colors.grey)
+        c.rect(MARGIN, top - HEADER_ROW_HEIGHT, xs[-1] - MARGIN, HEADER_ROW_HEIGHT, stroke=0, fill=1)
+        c.setFillColor(colors.beige)
+        c.rect(MARGIN, top - height, xs[-1] - MARGIN, height - HEADER_ROW_HEIGHT, stroke=0, fill=1)
+        c.setStrokeColor(colors.black)
+        c.grid(xs, ys)
+
+        centres = [(left + right) / 2 for left, right in zip(xs, xs[1:])]
+        c.setFillColor(colors.whitesmoke)
+        c.setFont("Helvetica-Bold", 12)
+        for x, value in zip(centres, header):
+            c.drawCentredString(x, top - HEADER_ROW_HEIGHT / 2 - 4, value)
+        c.setFillColor(colors.black)
+        c.setFont("Helvetica", 9)
+        for row_top, row in zip(ys[1:], rows):
+            for x, value in zip(centres, row):
+                c.drawCentredString(x, row_top - ROW_HEIGHT / 2 - 3, value)
+
+        self.y -= height
+
+    def table(self, header, rows, col_widths):
+        """Draw rows from an iterator, repeating the header on every page."""
+        if self.rows_that_fit() < 1:
+            self.new_page()
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == self.rows_that_fit():
+                self.draw_rows(header, batch, col_widths)
+                batch = []
+                self.new_page()
+        if batch:
+            self.draw_rows(header, batch, col_widths)
+        self.y -= 20
+
+    def save(self):
+        self.draw_footer()
+        self.canvas.save()
+
+
+def format_money(cents):
+    """Format integer cents exactly, e.g. 123456 -> '$1234.56'."""
+    cents = int(cents)
+    sign = '-' if cents < 0 else ''
+    return f"${sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+def in_range(table, user_id, start_date, end_before):
+    conditions = [table.c.user_id == user_id]
+    if start_date:
+        conditions.append(table.c.date >= start_date)
+    if end_before:
+        conditions.append(table.c.date < end_before)
+    return conditions
+
+
+def stream_rows(conn, query):
+    result = conn.execution_options(stream_results=True, yield_per=FETCH_CHUNK_SIZE).execute(query)
+    for row in result:
+        yield row
+
+
+def write_section(writer, title, header, rows, col_widths):
+    """Write a heading and table, or nothing at all if there are no rows."""
+    first = next(rows, None)
+    if first is None:
+        return
+    writer.heading(title)
+    writer.table(header, chain([first], rows), col_widths)
+
+
+def render_pdf_report(database_url, user_id, generated_at, start_date=None, end_before=None):
+    """Write the user's report for the date range to a temporary PDF file.
+
+    end_before is exclusive; the report shows the day before it as the end.
+
+    Returns the file path; the caller is responsible for deleting it.
+    """
+    engine = get_engine(database_url)
+    fd, path = tempfile.mkstemp(prefix='expense-report-', suffix='.pdf')
+    os.close(fd)
+
+    try:
+        with engine.connect() as conn:
+            income_filter = in_range(income_table, user_id, start_date, end_before)
+            expense_filter = in_range(expense_table, user_id, start_date, end_before)
+            total_income = conn.execute(
+                select(func.coalesce(func.sum(income_table.c.amount_cents), 0)).where(*income_filter)).scalar()
+            total_expenses = conn.execute(
+                select(func.coalesce(func.sum(expense_table.c.amount_cents), 0)).where(*expense_filter)).scalar()
+
+            writer = ReportWriter(path)
+            writer.text("Expense Tracker Report", font="Helvetica-Bold", size=20, spacing=30)
+            writer.text(f"Generated on: {generated_at}")
+            if start_date or end_before:
+                period_start = start_date.strftime('%Y-%m-%d') if start_date else 'beginning'
+                period_end = ((end_before - timedelta(microseconds=1)).strftime('%Y-%m-%d')
+                              if end_before else 'today')
+                writer.text(f"Period: {period_start} to {period_end}")
+            writer.y -= 10
+
+            writer.heading("Financial Summary")
+            writer.text(f"Total Income: {format_money(total_income)}", indent=20)
+            writer.text(f"Total Expenses: {format_money(total_expenses)}", indent=20)
+            writer.text(f"Balance: {format_money(total_income - total_expenses)}", indent=20)
+            writer.y -= 20
+
+            incomes = stream_rows(conn, select(
+                income_table.c.date, income_table.c.description, income_table.c.amount_cents
+            ).where(*income_filter).order_by(income_table.c.date, income_table.c.id))
+            write_section(
+                writer, "Income Records", ["Date", "Description", "Amount"],
+                ([row.date.strftime('%Y-%m-%d'), truncate(row.description), format_money(row.amount_cents)]
+                 for row in incomes),
+                [90, 330, 90]
+            )
+
+            expenses = stream_rows(conn, select(
+                expense_table.c.date, expense_table.c.description, expense_table.c.category,
+                expense_table.c.amount_cents
+            ).where(*expense_filter).order_by(expense_table.c.date, expense_table.c.id))
+            write_section(
+                writer, "Expense Records", ["Date", "Description", "Category", "Amount"],
+                ([row.date.strftime('%Y-%m-%d'), truncate(row.description), truncate(row.category),
+                  format_money(row.amount_cents)] for row in expenses),
+                [80, 230, 110, 90]
+            )
+
+            writer.save()
+    except Exception:
+        os.remove(path)
+        raise
+
+    return path
@@ -0,0 +1,55 @@
+"""Offload CPU-bound rendering (charts, PDF reports) to a process pool.
+
+matplotlib and ReportLab hold the GIL while they draw, so a slow render in a
+request thread stalls every other request in the worker. The render service
+runs those jobs in separate processes instead. Handlers submit a small,
+already-aggregated payload and get the encoded bytes back.
+
+Jobs run on a bounded_executor.BoundedExecutor. When it is saturated,
+submit() fails immediately with RenderBusy; a job that takes longer than the
+timeout raises RenderTimeout, and one whose render process died (out of
+memory, a crash in native code) raises RenderCrashed. With processes=0 jobs
+run inline in the calling thread, which suits development and serverless
+deployments, where forking helper processes is not worthwhile.
+"""
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, TimeoutError
+
+from bounded_executor import BoundedExecutor, ExecutorBusy
+
+
+class RenderUnavailable(Exception):
+    """Base class for render jobs that could not be completed."""
+
+
+class RenderBusy(RenderUnavailable):
+    pass
+
+
+class RenderTimeout(RenderUnavailable):
+    pass
+
+
+class RenderCrashed(RenderUnavailable):
+    pass
+
+
+class RenderService:
+    def __init__(self, processes=0, max_pending=16, timeout=30.0):
+        self.processes = processes
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = BoundedExecutor(ProcessPoolExecutor, processes, max_pending)
+
+    def submit(self, fn, *args):
+        """Run fn(*args) (a picklable, module-level function) and return its result."""
+        try:
+            return self._executor.run(fn, *args, timeout=self.timeout)
+        except ExecutorBusy:
+            raise RenderBusy('Renderer is busy, try again shortly') from None
+        except TimeoutError:
+            raise RenderTimeout('Rendering took too long') from None
+        except BrokenExecutor:
+            raise RenderCrashed('A render process died, try again shortly') from None
+
+    def shutdown(self):
+        self._executor.shutdown()